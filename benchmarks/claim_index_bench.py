@@ -0,0 +1,138 @@
+# benchmarks/claim_index_bench.py
+"""
+공유 보상 claim 추적 비교
+  기존    : claim:{uuid4} 를 TTL 없이 저장
+  기본    : ClaimIndex — 짧은 share_id + 보존 기간 TTL (Bloom 꺼짐, 현재 기본값)
+  +Bloom  : ClaimIndex(bloom=True) — 위 + 일 단위 Bloom 필터 (CLAIM_BLOOM_ENABLED=true)
+
+  python -m benchmarks.claim_index_bench --claims 100000 --lookups 200000 --days 90
+
+- 메모리: tracemalloc 으로 claim 1건당 바이트 → days 일 누적 (기존은 무한 누적, 신규는 보존 기간까지만)
+  절감은 전부 TTL(보존 기간 이후 삭제)에서 나옴 — 건당 메모리는 만료 힙 항목 때문에 기존보다 큼.
+  Bloom 은 claim: 키를 대체하지 않으므로 메모리를 (조금) 더함.
+- 조회 처리량: 같은 프로세스 MemoryStore 기준 실측. 이 구성에서는 순수 파이썬 Bloom 이 dict 조회보다 느림.
+- [모델] 줄은 실측이 아님: 저장소 왕복(--store-rtt-us)이 있다고 가정한 계산치 (원격 저장소 도입 시 판단용)
+"""
+from __future__ import annotations
+
+import time
+import uuid
+import random
+import argparse
+import tracemalloc
+
+import dependencies
+from dependencies import MemoryStore
+from services.claim_index import ClaimIndex, new_share_id, SHARE_RETENTION_DAYS
+
+
+def _reset():
+    dependencies._STORE.clear()
+    dependencies._EXPQ.clear()
+
+
+def _measure(fn) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = fn()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return after - before
+
+
+def _fill_old(R, ids):
+    for sid in ids:
+        R.set(f"claim:{sid}", "user-1234")
+
+
+def _fill_index(idx, ids):
+    for sid in ids:
+        idx.mark_claimed(sid, "user-1234")
+    return idx
+
+
+def bench_memory(n: int) -> dict:
+    R = MemoryStore()
+    out = {}
+
+    _reset()
+    ids_old = [str(uuid.uuid4()) for _ in range(n)]
+    out["old"] = _measure(lambda: _fill_old(R, ids_old)) / n
+
+    for name, bloom in (("index", False), ("bloom", True)):
+        _reset()
+        ids_new = [new_share_id() for _ in range(n)]
+        idx = ClaimIndex(R, capacity=n, bloom=bloom)
+        out[name] = _measure(lambda: _fill_index(idx, ids_new)) / n
+        if bloom:
+            out["bloom_bytes"] = idx.stats()["bloom_bytes"]
+    out["id_len_old"] = len(ids_old[0])
+    out["id_len_new"] = len(ids_new[0])
+    return out
+
+
+def bench_lookup(n: int, lookups: int, hit_ratio: float) -> dict:
+    R = MemoryStore()
+    rnd = random.Random(7)
+    out = {}
+
+    _reset()
+    old_ids = [str(uuid.uuid4()) for _ in range(n)]
+    _fill_old(R, old_ids)
+    old_q = [rnd.choice(old_ids) if rnd.random() < hit_ratio else str(uuid.uuid4()) for _ in range(lookups)]
+    t0 = time.perf_counter()
+    for sid in old_q:
+        R.get(f"claim:{sid}") is not None
+    out["old"] = lookups / (time.perf_counter() - t0)
+
+    for name, bloom in (("index", False), ("bloom", True)):
+        _reset()
+        idx = _fill_index(ClaimIndex(R, capacity=n, bloom=bloom), [new_share_id() for _ in range(n)])
+        new_ids = [k[len("claim:"):] for k in dependencies._STORE if k.startswith("claim:")]
+        q = [rnd.choice(new_ids) if rnd.random() < hit_ratio else new_share_id() for _ in range(lookups)]
+        t0 = time.perf_counter()
+        for sid in q:
+            idx.is_claimed(sid)
+        out[name] = lookups / (time.perf_counter() - t0)
+        out[name + "_exact_ratio"] = idx.stats()["exact_lookups"] / lookups
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--claims", type=int, default=100_000, help="하루 claim 수(= 파티션 용량)")
+    ap.add_argument("--lookups", type=int, default=200_000)
+    ap.add_argument("--hit-ratio", type=float, default=0.05, help="조회 중 이미 수령된 share 비율")
+    ap.add_argument("--days", type=int, default=90, help="누적 기간(기존 방식은 전부 남음)")
+    ap.add_argument("--store-rtt-us", type=float, default=200.0,
+                    help="[모델] 원격 저장소(Redis 등) 1회 왕복 가정치 — 실측 아님")
+    args = ap.parse_args(argv)
+
+    m = bench_memory(args.claims)
+    l = bench_lookup(args.claims, args.lookups, args.hit_ratio)
+
+    keep_days = min(args.days, SHARE_RETENTION_DAYS)
+    mb = 1024 * 1024
+    total = {
+        "old": m["old"] * args.claims * args.days,
+        "index": m["index"] * args.claims * keep_days,
+        "bloom": m["bloom"] * args.claims * keep_days,
+    }
+    print(f"{'':26s} {'기존':>12s} {'TTL+짧은ID':>12s} {'+Bloom':>12s}")
+    print(f"{'share_id 길이':26s} {m['id_len_old']:>12d} {m['id_len_new']:>12d} {m['id_len_new']:>12d}")
+    print(f"{'claim 1건당 메모리 (B)':26s} {m['old']:>12.0f} {m['index']:>12.0f} {m['bloom']:>12.0f}")
+    print(f"{f'{args.days}일 누적 (MB)':26s} {total['old'] / mb:>12.0f} {total['index'] / mb:>12.0f} "
+          f"{total['bloom'] / mb:>12.0f}   (보존 {SHARE_RETENTION_DAYS}일, Bloom {m['bloom_bytes'] / args.claims:.1f} B/건)")
+    print(f"{f'조회/s (hit {args.hit_ratio:.0%}, 실측)':26s} {l['old']:>12,.0f} {l['index']:>12,.0f} {l['bloom']:>12,.0f}")
+    print(f"{'정확 저장소 조회 비율':26s} {1:>12.0%} {l['index_exact_ratio']:>12.0%} {l['bloom_exact_ratio']:>12.1%}")
+
+    # 실측 아님: 저장소가 네트워크 너머에 있을 때 조회당 CPU 시간 + (저장소 조회 비율 × 왕복)
+    rtt = args.store_rtt_us / 1e6
+    eff = {k: 1 / (1 / l[k] + (1 if k == "old" else l[k + "_exact_ratio"]) * rtt) for k in ("old", "index", "bloom")}
+    print(f"{f'[모델] RTT {args.store_rtt_us:.0f}µs 가정 조회/s':26s} {eff['old']:>12,.0f} {eff['index']:>12,.0f} "
+          f"{eff['bloom']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
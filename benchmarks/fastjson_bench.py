@@ -0,0 +1,116 @@
+# benchmarks/fastjson_bench.py
+"""
+FAST_JSON 전후 비교: 핫 엔드포인트 초당 요청 수 (ASGI 앱을 프로세스 안에서 직접 호출 — 네트워크/서버 제외)
++ 스토어 set_json/get_json 왕복.
+
+  python -m benchmarks.fastjson_bench --requests 20000
+
+FAST_JSON 은 import 시점에 읽히므로 모드별로 자식 프로세스를 띄워 측정.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+
+ENDPOINTS = [
+    ("POST", "/license/status", {"user_id": "bench-user"}),
+    ("POST", "/license/consume", {"user_id": "bench-user"}),
+    ("POST", "/share/claim", None),  # share_id 는 실행 중 생성
+    ("GET", "/health", None),
+]
+
+
+async def _call(app, method: str, path: str, body: bytes) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "server": ("bench", 80), "client": ("127.0.0.1", 1),
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    }
+    sent = False
+    status = 0
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(msg):
+        nonlocal status
+        if msg["type"] == "http.response.start":
+            status = msg["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _child(n: int) -> dict:
+    import main
+    from dependencies import get_store
+    from services.license_service import LicenseStore
+
+    app = main.app
+    S = LicenseStore()
+    S.activate_pass("bench-user", days=30)  # consume 가 항상 성공하도록
+    R = get_store()
+    out = {}
+
+    for method, path, payload in ENDPOINTS:
+        if path == "/share/claim":
+            # 요청마다 새 share + 새 user 로 claim (중복/한도 분기 없이 성공 경로만 측정)
+            from services.claim_index import new_share_id
+            ids = [new_share_id() for _ in range(n)]
+            for sid in ids:
+                R.set_json(f"share:{sid}", {"user_id": "x", "title": "t", "summary": ""}, 3600)
+            bodies = [json.dumps({"user_id": f"u{i}", "share_id": sid}).encode() for i, sid in enumerate(ids)]
+        else:
+            body = json.dumps(payload).encode() if payload else b""
+            bodies = [body] * n
+        for b in bodies[:200]:  # 워밍업
+            await _call(app, method, path, b)
+        t0 = time.perf_counter()
+        for b in bodies:
+            await _call(app, method, path, b)
+        out[path] = n / (time.perf_counter() - t0)
+
+    obj = {"user_id": "u1", "title": "제목" * 10, "summary": "요약 " * 40, "tags": ["a", "b"], "emojis": ["🙂"] * 3}
+    t0 = time.perf_counter()
+    for i in range(n):
+        R.set_json("bench:share", obj)
+        R.get_json("bench:share")
+    out["store set_json+get_json"] = n / (time.perf_counter() - t0)
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=20000)
+    ap.add_argument("--child", action="store_true")
+    args = ap.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child(args.requests))))
+        return
+
+    res = {}
+    for mode in ("false", "true"):
+        env = dict(os.environ, FAST_JSON=mode)
+        p = subprocess.run([sys.executable, "-m", "benchmarks.fastjson_bench", "--child",
+                            "--requests", str(args.requests)], env=env, capture_output=True, text=True, check=True)
+        res[mode] = json.loads(p.stdout.strip().splitlines()[-1])
+
+    print(f"{'':28s} {'FAST_JSON=false':>16s} {'FAST_JSON=true':>16s} {'변화':>8s}")
+    for k in res["false"]:
+        a, b = res["false"][k], res["true"][k]
+        print(f"{k:28s} {a:14,.0f}/s {b:14,.0f}/s {(b / a - 1) * 100:+7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,31 @@
 # back/dependencies.py
+import os
 import time
-import json
+import hmac
+import heapq
+from collections import deque
 from typing import Any, Optional
 
+from fastapi import Header, HTTPException
+
+from services import fastjson
+
 _STORE = {}  # { key: {"val": str, "exp": int|None} }
+_LISTS = {}  # { key: deque[str] } — 작업 큐용 (Redis LIST 대응)
+_EXPQ = []   # (exp, key) 최소 힙 — 읽히지 않는 만료 키도 메모리에서 제거(능동 만료)
 
 def now_ts() -> int:
     return int(time.time())
 
+def _sweep(now: int, budget: int = 64):
+    # 쓰기마다 조금씩: 만료 시각이 지난 키를 최대 budget 개 정리
+    while _EXPQ and budget > 0 and _EXPQ[0][0] <= now:
+        exp, key = heapq.heappop(_EXPQ)
+        item = _STORE.get(key)
+        if item and item.get("exp") == exp:  # 그 사이 덮어쓴 키는 건너뜀
+            del _STORE[key]
+        budget -= 1
+
 class MemoryStore:
     def get(self, key: str) -> Optional[str]:
         item = _STORE.get(key)
@@ -20,15 +38,22 @@ class MemoryStore:
         return item.get("val")
 
     def set(self, key: str, value: str, ttl_seconds: Optional[int] = None):
-        exp = now_ts() + int(ttl_seconds) if ttl_seconds else None
+        now = now_ts()
+        exp = now + int(ttl_seconds) if ttl_seconds else None
         _STORE[key] = {"val": value, "exp": exp}
+        if exp:
+            heapq.heappush(_EXPQ, (exp, key))
+        _sweep(now)
+
+    def delete(self, key: str):
+        _STORE.pop(key, None)
 
     def set_json(self, key: str, obj: Any, ttl_seconds: Optional[int] = None):
-        self.set(key, json.dumps(obj), ttl_seconds)
+        self.set(key, fastjson.dumps(obj), ttl_seconds)
 
     def get_json(self, key: str) -> Any:
         raw = self.get(key)
-        return json.loads(raw) if raw else None
+        return fastjson.loads(raw) if raw else None
 
     def incr(self, key: str, ttl_seconds: Optional[int] = None) -> int:
         v = self.get(key)
@@ -40,5 +65,44 @@ class MemoryStore:
         self.set(key, str(n), ttl_seconds)
         return n
 
+    # ---- 배치 — Redis MGET/MSET(파이프라인) 과 같은 의미 ----
+    def mget(self, keys: list[str]) -> list[Optional[str]]:
+        return [self.get(k) for k in keys]
+
+    def mset(self, mapping: dict[str, str], ttl_seconds: Optional[int] = None):
+        now = now_ts()
+        exp = now + int(ttl_seconds) if ttl_seconds else None
+        for k, v in mapping.items():
+            _STORE[k] = {"val": v, "exp": exp}
+            if exp:
+                heapq.heappush(_EXPQ, (exp, k))
+        _sweep(now)
+
+    # ---- 리스트(큐) — Redis RPUSH/LPOP/LLEN 과 같은 의미 ----
+    def rpush(self, key: str, value: str) -> int:
+        q = _LISTS.setdefault(key, deque())
+        q.append(value)
+        return len(q)
+
+    def lpop(self, key: str) -> Optional[str]:
+        q = _LISTS.get(key)
+        if not q:
+            return None
+        return q.popleft()
+
+    def llen(self, key: str) -> int:
+        q = _LISTS.get(key)
+        return len(q) if q else 0
+
 def get_store() -> MemoryStore:
     return MemoryStore()
+
+# ---- 관리자 인증 ----
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    관리자 전용 라우트용 의존성. ADMIN_TOKEN 미설정이면 관리자 API 전체 비활성.
+    """
+    if not ADMIN_TOKEN or not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="ADMIN_ONLY")
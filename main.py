@@ -3,8 +3,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import share, iap
 from routers import analyze, license as license_router  # 프로젝트에 맞게 포함
+from routers import report, card, admin
+from services import report_service, card_service
+from services.profiling import ProfilingMiddleware, PROFILING_ENABLED
+from services import fastjson
 
-app = FastAPI()
+# FAST_JSON=true 면 orjson 기본 응답 클래스
+app = FastAPI(default_response_class=fastjson.default_response_class())
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,11 +19,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 온디맨드 프로파일링 (PROFILE_SECRET / PROFILE_SAMPLE_RATE 설정 시에만 장착)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 app.include_router(share.router)
 app.include_router(iap.router)
 app.include_router(license_router.router)
 app.include_router(analyze.router)
+app.include_router(report.router)
+app.include_router(card.router)
+app.include_router(admin.router)
+
+# 리포트 작업 워커 (로컬 메모리 큐 — 외부 브로커 불필요)
+app.add_event_handler("startup", report_service.start_workers)
+app.add_event_handler("shutdown", report_service.stop_workers)
+app.add_event_handler("shutdown", card_service.shutdown)
 
 @app.get("/health")
 def health():
-    return {"ok": True}
+    return fastjson.ok_response()
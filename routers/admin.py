@@ -0,0 +1,134 @@
+# routers/admin.py
+import codecs
+import json
+import time
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from typing import Literal, Optional
+from dependencies import require_admin
+from services.license_service import LicenseStore
+from services.bulk_license import apply_stream, BULK_BATCH_SIZE
+from services import model_router
+from services.admission import ADMISSION
+from services import profiling, analysis_cache
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+S = LicenseStore()
+
+
+async def _aiter_lines(request: Request):
+    # 본문을 한 번에 올리지 않고 청크 단위로 줄을 잘라 넘김
+    dec = codecs.getincrementaldecoder("utf-8")()
+    rest = ""
+    async for chunk in request.stream():
+        rest += dec.decode(chunk)
+        *lines, rest = rest.split("\n")
+        for ln in lines:
+            yield ln + "\n"
+    rest += dec.decode(b"", final=True)
+    if rest:
+        yield rest
+
+
+@router.post("/license/bulk")
+async def license_bulk(request: Request, fmt: Literal["csv", "jsonl"] = "jsonl", batch: Optional[int] = None):
+    """
+    CSV/JSONL 본문 스트리밍 → 배치 단위로 티켓 지급/패스 활성화.
+    op_id 단위 멱등이라 같은 본문을 재전송해도 안전.
+    """
+    size = batch or BULK_BATCH_SIZE
+    t0 = time.perf_counter()
+    total = {"applied": 0, "duplicate": 0, "invalid": 0, "lines": 0}
+    header: Optional[str] = None
+    buf: list[str] = []
+
+    def _flush():
+        rows = ([header] if fmt == "csv" else []) + buf
+        res = apply_stream(S, rows, fmt, batch_size=size, start_line=total["lines"])
+        for k in total:
+            total[k] += res[k]
+        buf.clear()
+
+    async for ln in _aiter_lines(request):
+        if fmt == "csv" and header is None:
+            header = ln
+            continue
+        if not ln.strip():
+            continue
+        buf.append(ln)
+        if len(buf) >= size:
+            _flush()
+    if buf:
+        _flush()
+
+    elapsed = time.perf_counter() - t0
+    total["elapsed_sec"] = round(elapsed, 3)
+    total["ops_per_sec"] = round(total["lines"] / elapsed, 1) if elapsed > 0 else None
+    return total
+
+
+@router.post("/analysis-cache/import")
+async def analysis_cache_import(request: Request):
+    """
+    JSONL {"cache_key", "result"} → 분석 캐시 적재. services.reanalyze --push-url 이 사용.
+    """
+    n = bad = 0
+    async for ln in _aiter_lines(request):
+        if not ln.strip():
+            continue
+        try:
+            item = json.loads(ln)
+            key, result = item["cache_key"], item["result"]
+        except (ValueError, KeyError, TypeError):
+            bad += 1
+            continue
+        if not str(key).startswith("acache:") or not isinstance(result, dict):
+            bad += 1
+            continue
+        analysis_cache.put(key, result)
+        n += 1
+    return {"imported": n, "invalid": bad}
+
+
+@router.get("/models")
+def models_status():
+    """
+    모델 라우터 후보별 EWMA 지연 / p95 / 에러율 / 서킷 상태.
+    """
+    return {"hedge": model_router.ROUTER_HEDGE, "candidates": model_router.snapshot()}
+
+
+@router.get("/admission")
+def admission_status(fmt: Literal["json", "prom"] = "json"):
+    """
+    어드미션 큐 깊이 / 대기 시간 / 차단 수. fmt=prom 이면 Prometheus 텍스트 포맷.
+    """
+    if fmt == "prom":
+        return PlainTextResponse(ADMISSION.prometheus_text(), media_type="text/plain; version=0.0.4")
+    return ADMISSION.metrics()
+
+
+@router.get("/profiles")
+def profiles_list():
+    """
+    최근 요청 프로파일 목록(최신순). collapsed stack 포맷 — flamegraph.pl / speedscope 로 열기.
+    """
+    return {"enabled": profiling.PROFILING_ENABLED, "profiles": profiling.list_profiles()}
+
+
+@router.get("/profiles/token")
+def profiles_token(ttl: int = 300):
+    """
+    X-Gnom-Profile 헤더용 서명 토큰 발급 (PROFILE_SECRET 필요).
+    """
+    if not profiling.PROFILE_SECRET:
+        raise HTTPException(status_code=400, detail="PROFILE_SECRET_NOT_SET")
+    return {"header": "X-Gnom-Profile", "token": profiling.make_token(min(max(ttl, 10), 3600))}
+
+
+@router.get("/profiles/{name}")
+def profiles_get(name: str):
+    body = profiling.read_profile(name)
+    if body is None:
+        raise HTTPException(status_code=404, detail="PROFILE_NOT_FOUND")
+    return PlainTextResponse(body)
@@ -1,24 +1,25 @@
 # routers/analyze.py
-import os
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
+from starlette.concurrency import run_in_threadpool
 from services.prompt_loader import load_prompt
 from services.license_service import LicenseStore
-
-# OpenAI SDK v1
-from openai import OpenAI
+from services.thread_service import analyze_thread
+from services import model_router
+from services.admission import ADMISSION, AdmissionRejected, tier_of
+from services import analysis_cache
 
 router = APIRouter(prefix="", tags=["analyze"])
 S = LicenseStore()
 
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # 필요 모델로 교체 가능
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 class AnalyzeBody(BaseModel):
     message: str
     # 필요시 옵션 확장
     lang: Optional[str] = "ko"
+    # 있으면 사용권 1개를 이 호출에서 바로 소비(/license/consume 불필요).
+    # 분석 실패/캐시 적중 시 자동 환불. 사용권 상태로 우선순위(티어)도 결정.
+    user_id: Optional[str] = None
 
 class AnalyzeResp(BaseModel):
     interpretation: str
@@ -26,6 +27,21 @@ class AnalyzeResp(BaseModel):
     tags: list[str]
     emojis: list[str]
 
+class AnalyzeWithLicenseResp(AnalyzeResp):
+    cached: bool = False
+    license: Optional[dict] = None  # user_id 로 호출 시 소비 후 사용권 상태
+
+class ThreadAnalyzeBody(BaseModel):
+    user_id: str
+    target_id: str            # target_users.id (상대방)
+    messages: list[str]       # 스레드 전체를 보내도 됨 — 이미 분석된 메시지는 서버에서 건너뜀
+    relationship: Optional[str] = ""
+    start_seq: int = 0        # messages[0] 의 스레드 내 순번 (최근 일부만 보낼 때)
+
+class ThreadAnalyzeResp(AnalyzeResp):
+    delta: int = 0            # 이번에 새로 분석된 메시지 수
+    cached: bool = False
+
 def _build_system_prompt(lang: str = "ko") -> str:
     """
     prompts 폴더에서 'system'과 'schema' 두 파일을 합쳐 시스템 메시지로 사용.
@@ -51,6 +67,7 @@ def _parse_to_struct(raw_text: str) -> AnalyzeResp:
     """
     모델 출력이 포맷이 조금 달라도 최대한 구조화.
     간단한 파서(규칙 기반) — 필요시 JSON 모드로 바꿔도 됨.
+    감정해석/통찰 라벨이 하나도 없으면(거절 문구 등) ValueError.
     """
     text = raw_text.strip()
     # 아주 단순 파싱
@@ -64,6 +81,8 @@ def _parse_to_struct(raw_text: str) -> AnalyzeResp:
     insight = _find("한 줄 통찰") or _find("통찰")
     tags = (_find("감정 분류") or _find("분류")).replace("·", ",").replace(" ", "")
     emojis = _find("이모지")
+    if not interp and not insight:
+        raise ValueError("no 감정해석/통찰 label")
 
     out = AnalyzeResp(
         interpretation=interp or text[:150],
@@ -73,30 +92,102 @@ def _parse_to_struct(raw_text: str) -> AnalyzeResp:
     )
     return out
 
-@router.post("/analyze", response_model=AnalyzeResp)
-def analyze(b: AnalyzeBody):
-    # 사용권 확인(권장: 라우터 앞단에서 consumeOne을 호출했다면 여기선 상태만 확인)
-    st = S.status(b.message[:16])  # 예: 내부 추적 id 대체 — 실제로는 사용자 ID로 확인
-    # (여기선 단순화 — 실제 서비스는 user_id 기반 권한 확인 사용 권장)
+def _tier(user_id: Optional[str]) -> str:
+    return tier_of(S.status(user_id)) if user_id else "free"
 
-    if not os.getenv("OPENAI_API_KEY"):
-        # 키 없을 때 예시 응답(네가 보던 문구)을 여전히 유지하되, 200으로 내려주지 말고 400~401로 명확화해도 됨.
-        raise HTTPException(status_code=400, detail="OPENAI_API_KEY_NOT_SET")
 
+def _rejected(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=e.status, detail=e.reason, headers=e.headers())
+
+
+def _prompts(b: AnalyzeBody) -> tuple[str, str]:
     system_prompt = _build_system_prompt(b.lang or "ko")
     user_prompt = load_prompt("user") if "user" in set() else ""  # 필요 시 user 템플릿 사용
     content = f"{user_prompt}\n\n[INPUT]\n{b.message}".strip()
+    return system_prompt, content
+
 
+def _analyze_sync(system_prompt: str, content: str, tier: str) -> AnalyzeResp:
     try:
-        resp = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
+        # 후보 모델 중 지연/에러율 기준 최선 모델로 라우팅 (MODEL_ROUTES 없으면 OPENAI_MODEL 단일)
+        txt = model_router.chat(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": content},
             ],
+            tier=tier,
             temperature=0.3,
         )
-        txt = resp.choices[0].message.content or ""
-        return _parse_to_struct(txt)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"MODEL_ERROR: {e}")
+    if not txt.strip():
+        raise HTTPException(status_code=502, detail="MODEL_EMPTY")
+    try:
+        return _parse_to_struct(txt)
+    except ValueError:
+        # 검증 안 된 출력은 캐시/사용권 확정 없이 실패 처리 → 호출부에서 환불
+        raise HTTPException(status_code=502, detail="MODEL_UNPARSEABLE")
+
+
+@router.post("/analyze", response_model=AnalyzeWithLicenseResp)
+async def analyze(b: AnalyzeBody):
+    """
+    분석 1회. user_id 를 주면 사용권 예약(free → ticket, 패스는 차감 없음) 후
+    정상 결과일 때만 확정, 모델/파싱 실패나 캐시 적중이면 환불.
+    """
+    if not model_router.configured():
+        # 키 없을 때 예시 응답(네가 보던 문구)을 여전히 유지하되, 200으로 내려주지 말고 400~401로 명확화해도 됨.
+        raise HTTPException(status_code=400, detail="OPENAI_API_KEY_NOT_SET")
+
+    tier = "free"
+    rid = None
+    if b.user_id:
+        tier = tier_of(S.status(b.user_id))
+        rid = S.reserve(b.user_id)
+        if rid is None:
+            raise HTTPException(status_code=402, detail="NO_TOKENS")
+
+    def _license() -> Optional[dict]:
+        return S.status(b.user_id) if b.user_id else None
+
+    system_prompt, content = _prompts(b)
+    ckey = analysis_cache.cache_key("analyze", system_prompt, content)
+    hit = analysis_cache.get(ckey)
+    if hit:
+        S.release(rid)
+        return {**hit, "cached": True, "license": _license()}
+
+    # 과부하 시 패스/티켓 보유자 우선 — 저우선 요청은 429/503 + Retry-After
+    try:
+        async with ADMISSION.slot(tier):
+            out = await run_in_threadpool(_analyze_sync, system_prompt, content, tier)
+    except AdmissionRejected as e:
+        S.release(rid)
+        raise _rejected(e)
+    except BaseException:
+        # 모델/파싱 실패, 클라이언트 이탈(취소) 모두 환불
+        S.release(rid)
+        raise
+
+    S.commit(rid)
+    result = out.model_dump()
+    analysis_cache.put(ckey, result)
+    return {**result, "cached": False, "license": _license()}
+
+
+@router.post("/analyze/thread", response_model=ThreadAnalyzeResp)
+async def analyze_thread_endpoint(b: ThreadAnalyzeBody):
+    """
+    같은 상대와의 대화 스레드 증분 분석.
+    누적 요약 + 새 메시지만 모델로 보내므로 스레드가 길어져도 입력 크기는 거의 일정.
+    """
+    if not b.messages:
+        raise HTTPException(status_code=422, detail="messages empty")
+    tier = _tier(b.user_id)
+    try:
+        async with ADMISSION.slot(tier):
+            return await run_in_threadpool(
+                analyze_thread, b.user_id, b.target_id, b.messages, b.relationship or "", tier, b.start_seq
+            )
+    except AdmissionRejected as e:
+        raise _rejected(e)
@@ -0,0 +1,35 @@
+# routers/card.py
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel
+from typing import Literal, Optional
+from services import card_service as C
+
+router = APIRouter(prefix="/cards", tags=["cards"])
+
+# 같은 입력이면 같은 이미지 → 클라이언트/CDN 캐시 길게
+IMAGE_CACHE_CONTROL = "public, max-age=86400, immutable"
+
+
+class CardRenderBody(BaseModel):
+    title: Optional[str] = ""
+    interpretation: Optional[str] = ""
+    insight: Optional[str] = ""
+    tags: list[str] = []
+    emojis: list[str] = []
+    fmt: Literal["png", "webp"] = "png"
+    layout: Literal["card", "og"] = "card"
+
+
+@router.post("/render")
+async def card_render(b: CardRenderBody):
+    """
+    분석 결과 → 감정 카드 이미지(png/webp).
+    """
+    spec = C.build_spec(b.title or "", b.interpretation or "", b.insight or "", b.tags, b.emojis)
+    try:
+        data, media_type = await C.render_card_image(spec, b.fmt, b.layout)
+    except C.FontMissing:
+        raise HTTPException(status_code=503, detail="CARD_FONT_MISSING")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"RENDER_FAILED: {e}")
+    return Response(content=data, media_type=media_type, headers={"Cache-Control": IMAGE_CACHE_CONTROL})
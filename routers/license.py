@@ -2,6 +2,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from services.license_service import LicenseStore
+from services.fastjson import raw_json, ok_response
 
 router = APIRouter(prefix="/license", tags=["license"])
 S = LicenseStore()  # 싱글톤처럼 재사용
@@ -25,7 +26,7 @@ def license_bootstrap(b: LicenseBootstrapBody):
     # 부트스트랩만 수행 (리턴값 사용 X)
     S.bootstrap(b.user_id)
     # 항상 최신 상태를 반환해서 프론트에서 바로 st 세팅 가능하게.
-    return S.status(b.user_id)
+    return raw_json(S.status(b.user_id))
 
 
 @router.post("/status")
@@ -33,16 +34,17 @@ def license_status(b: LicenseStatusBody):
     """
     현재 무료권/티켓/7일 패스 상태 조회.
     """
-    return S.status(b.user_id)
+    return raw_json(S.status(b.user_id))
 
 
 @router.post("/consume")
 def license_consume(b: LicenseConsumeBody):
     """
     해석 1회 소비. free > 0 또는 ticket > 0 또는 7일패스가 있으면 통과.
+    (신규 클라이언트는 POST /analyze 에 user_id 를 넣으면 소비+분석이 한 번에 처리됨)
     """
     ok = S.consume_one(b.user_id)
     if not ok:
         # 프론트에서는 이 코드를 보고 "사용권 없음" 문구를 보여주게 됨.
         raise HTTPException(status_code=402, detail="NO_TOKENS")
-    return {"ok": True}
+    return ok_response()
@@ -0,0 +1,68 @@
+# routers/report.py
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+from typing import Optional
+from services.license_service import LicenseStore
+from services import report_service as RS
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+S = LicenseStore()
+
+LONG_POLL_MAX = 30.0  # 초
+
+
+class ReportCreateBody(BaseModel):
+    user_id: str
+    target_id: str
+    period: str               # 예: "2026-10", "2026-W42"
+    messages: list[str]
+    relationship: Optional[str] = ""
+
+
+def _public(job: dict) -> dict:
+    # 내부 필드(messages, pdf_path 등)는 숨기고 상태만 노출
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "period": job["period"],
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+        "result": job["result"],
+        "pdf_url": f"/reports/{job['id']}/pdf" if job["status"] == "done" else None,
+        "error": job["error"],
+    }
+
+
+@router.post("", status_code=202)
+def report_create(b: ReportCreateBody):
+    """
+    프리미엄 리포트 작업 생성. 즉시 job id 반환 → GET /reports/{id} 로 폴링.
+    """
+    if not S.status(b.user_id)["pass_active"]:
+        raise HTTPException(status_code=402, detail="PASS_REQUIRED")
+    if not b.messages:
+        raise HTTPException(status_code=422, detail="messages empty")
+    job = RS.enqueue_report(b.user_id, b.target_id, b.period, b.messages, b.relationship or "")
+    return _public(job)
+
+
+@router.get("/{job_id}")
+async def report_get(job_id: str, wait: float = 0.0):
+    """
+    작업 상태 조회. wait(초)를 주면 완료될 때까지 최대 wait 초 롱폴링.
+    """
+    job = await RS.wait_job(job_id, timeout=min(max(wait, 0.0), LONG_POLL_MAX))
+    if not job:
+        raise HTTPException(status_code=404, detail="JOB_NOT_FOUND")
+    return _public(job)
+
+
+@router.get("/{job_id}/pdf")
+def report_pdf(job_id: str):
+    job = RS.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="JOB_NOT_FOUND")
+    if job["status"] != "done" or not job["pdf_path"]:
+        raise HTTPException(status_code=409, detail="NOT_READY")
+    return FileResponse(job["pdf_path"], media_type="application/pdf", filename=f"gnom_report_{job['period']}.pdf")
@@ -1,14 +1,18 @@
 # routers/share.py
 import os
-import uuid
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
+from typing import Literal
 from dependencies import get_store
 from services.license_service import LicenseStore
+from services import card_service as C
+from services.claim_index import ClaimIndex, new_share_id, ttl_for
+from services.fastjson import ok_response
 
 router = APIRouter(prefix="/share", tags=["share"])
 R = get_store()
 S = LicenseStore()
+CLAIMS = ClaimIndex(R)  # 정확 저장소(TTL) + 옵트인 Bloom 필터(CLAIM_BLOOM_ENABLED)
 
 # 공유 링크 베이스 / 스토어 링크는 환경변수로 주입 가능
 SHARE_BASE_URL = os.getenv("SHARE_BASE_URL", "https://gnom.ai/share")
@@ -19,6 +23,10 @@ class ShareCreateBody(BaseModel):
     user_id: str
     title: str
     summary: str | None = ""
+    # 서버 렌더 카드 이미지용 (선택)
+    insight: str | None = ""
+    tags: list[str] = []
+    emojis: list[str] = []
 
 
 class ShareClaimBody(BaseModel):
@@ -30,18 +38,22 @@ class ShareClaimBody(BaseModel):
 def share_create(b: ShareCreateBody):
     """
     공유용 링크 생성.
-    - share_id 생성 후 메모리 스토어에 간단한 메타데이터 저장
+    - share_id 생성 후 메모리 스토어에 간단한 메타데이터 저장 (보존 기간 TTL)
+    - share_id 는 시간 정렬 가능한 15자 base62 — 오래된 파티션을 통째로 폐기 가능
     - 프론트에는 share_id / share_url / store_url 반환
     """
-    share_id = str(uuid.uuid4())
+    share_id = new_share_id()
 
     payload = {
         "user_id": b.user_id,
         "title": b.title,
         "summary": b.summary or "",
+        "insight": b.insight or "",
+        "tags": b.tags[:3],
+        "emojis": b.emojis[:3],
     }
     # JSON 형태로 저장
-    R.set_json(f"share:{share_id}", payload)
+    R.set_json(f"share:{share_id}", payload, ttl_for(share_id))
 
     share_url = f"{SHARE_BASE_URL}/{share_id}"
     store_url = STORE_URL or None
@@ -50,9 +62,39 @@ def share_create(b: ShareCreateBody):
         "share_id": share_id,
         "share_url": share_url,
         "store_url": store_url,
+        "image_url": f"/share/{share_id}/image",
+        "og_image_url": f"/share/{share_id}/image?layout=og",
     }
 
 
+@router.get("/{share_id}/image")
+async def share_image(
+    share_id: str,
+    fmt: Literal["png", "webp"] = "png",
+    layout: Literal["card", "og"] = "card",
+):
+    """
+    공유 카드/OG 미리보기 이미지. 렌더 결과는 입력 해시로 캐시됨.
+    """
+    payload = R.get_json(f"share:{share_id}")
+    if not payload:
+        raise HTTPException(status_code=404, detail="INVALID_SHARE_ID")
+    spec = C.build_spec(
+        title=payload.get("title", ""),
+        interpretation=payload.get("summary", ""),
+        insight=payload.get("insight", ""),
+        tags=payload.get("tags", []),
+        emojis=payload.get("emojis", []),
+    )
+    try:
+        data, media_type = await C.render_card_image(spec, fmt, layout)
+    except C.FontMissing:
+        raise HTTPException(status_code=503, detail="CARD_FONT_MISSING")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"RENDER_FAILED: {e}")
+    return Response(content=data, media_type=media_type, headers={"Cache-Control": "public, max-age=86400"})
+
+
 @router.post("/claim")
 def share_claim(b: ShareClaimBody):
     """
@@ -63,12 +105,12 @@ def share_claim(b: ShareClaimBody):
     - 동일 share_id 중복 차단
     - 하루 2회 한도(+1씩)
     """
-    # 1) 존재하는 share_id 인지 확인
-    if not R.get(f"share:{b.share_id}"):
+    # 1) 존재하는 share_id 인지 확인 (보존 기간 지난 ID는 저장소 조회 없이 거절)
+    if CLAIMS.expired(b.share_id) or not R.get(f"share:{b.share_id}"):
         raise HTTPException(status_code=404, detail="INVALID_SHARE_ID")
 
-    # 2) 이미 이 share_id로 보상 받은 적 있는지 확인
-    if R.get(f"claim:{b.share_id}"):
+    # 2) 이미 이 share_id로 보상 받은 적 있는지 확인 (Bloom 켜져 있고 음성이면 저장소 조회 생략)
+    if CLAIMS.is_claimed(b.share_id):
         raise HTTPException(status_code=409, detail="ALREADY_CLAIMED")
 
     # 3) 하루 2회 초과인지 확인 + 티켓 지급
@@ -77,6 +119,6 @@ def share_claim(b: ShareClaimBody):
         raise HTTPException(status_code=429, detail="DAILY_SHARE_LIMIT")
 
     # 4) 이 share_id는 사용 완료 표시
-    R.set(f"claim:{b.share_id}", b.user_id)
+    CLAIMS.mark_claimed(b.share_id, b.user_id)
 
-    return {"ok": True}
+    return ok_response()
@@ -0,0 +1,224 @@
+# services/admission.py
+"""
+모델 호출 앞단 우선순위 어드미션 제어.
+
+- 전체 동시 모델 호출 수 상한(ADMISSION_CONCURRENCY)
+- 티어별 대기열(pass > ticket > free) — 슬롯이 비면 가중 라운드로빈으로 다음 요청 선택
+- 티어별 최대 대기 시간 초과 → 503 + Retry-After
+- 저우선 티어(기본 free)는 예상 대기가 목표치를 넘으면 줄 서기 전에 429 + Retry-After 로 조기 차단
+- 큐 깊이/대기 시간 지표는 metrics() / prometheus_text() 로 노출
+"""
+from __future__ import annotations
+
+import os
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+TIERS = ("pass", "ticket", "free")
+
+ADMISSION_CONCURRENCY = int(os.getenv("ADMISSION_CONCURRENCY", "8"))
+ADMISSION_TARGET_WAIT_SEC = float(os.getenv("ADMISSION_TARGET_WAIT_SEC", "2.0"))
+ADMISSION_SHED_TIERS = tuple(t.strip() for t in os.getenv("ADMISSION_SHED_TIERS", "free").split(",") if t.strip())
+ADMISSION_MAX_DEPTH = int(os.getenv("ADMISSION_MAX_DEPTH", "200"))  # 티어별 대기열 최대 길이
+
+WEIGHTS = {"pass": 6, "ticket": 3, "free": 1}
+MAX_WAIT_SEC = {
+    "pass": float(os.getenv("ADMISSION_MAX_WAIT_PASS", "20")),
+    "ticket": float(os.getenv("ADMISSION_MAX_WAIT_TICKET", "15")),
+    "free": float(os.getenv("ADMISSION_MAX_WAIT_FREE", "5")),
+}
+_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """
+    status: 429(조기 차단) | 503(대기 시간 초과/대기열 가득)
+    """
+    def __init__(self, status: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+
+def tier_of(status: Optional[dict]) -> str:
+    """
+    LicenseStore.status() 결과 → 티어. 사용자 정보 없으면 free.
+    """
+    if not status:
+        return "free"
+    if status.get("pass_active"):
+        return "pass"
+    if status.get("ticket", 0) > 0:
+        return "ticket"
+    return "free"
+
+
+class _TierStats:
+    def __init__(self):
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.wait_ewma = 0.0
+        self.recent: deque = deque(maxlen=500)
+
+    def record_wait(self, sec: float):
+        self.admitted += 1
+        self.wait_ewma = (1 - _ALPHA) * self.wait_ewma + _ALPHA * sec
+        self.recent.append(sec)
+
+    def p95(self) -> float:
+        xs = sorted(self.recent)
+        return xs[min(len(xs) - 1, int(len(xs) * 0.95))] if xs else 0.0
+
+
+class AdmissionController:
+    def __init__(self, limit: int = ADMISSION_CONCURRENCY):
+        self.limit = max(1, limit)
+        self.inflight = 0
+        self.queues: Dict[str, deque] = {t: deque() for t in TIERS}
+        self.stats: Dict[str, _TierStats] = {t: _TierStats() for t in TIERS}
+        self._cw: Dict[str, int] = {t: 0 for t in TIERS}  # 가중 라운드로빈 현재 가중치
+        self.service_ewma = 1.0  # 모델 호출 평균 소요(초) — 예상 대기 계산용
+
+    # ---- 예상 대기 ----
+    def _estimate_wait(self, tier: str) -> float:
+        # 나보다 우선순위가 같거나 높은 대기열 길이 × 평균 처리 시간 / 동시성
+        # + 지금 내 대기열 맨 앞 요청이 이미 기다린 시간 (대기열이 비면 0 → 과거 EWMA 로 계속 차단되지 않음)
+        ahead = sum(len(self.queues[t]) for t in TIERS if WEIGHTS[t] >= WEIGHTS[tier])
+        inst = ahead * self.service_ewma / self.limit
+        q = self.queues[tier]
+        head_age = time.monotonic() - q[0][1] if q else 0.0
+        return max(inst, head_age)
+
+    def _pick_tier(self) -> Optional[str]:
+        # nginx 식 smooth weighted round-robin (비어 있지 않은 대기열만)
+        live = [t for t in TIERS if self.queues[t]]
+        if not live:
+            return None
+        total = 0
+        for t in live:
+            self._cw[t] += WEIGHTS[t]
+            total += WEIGHTS[t]
+        best = max(live, key=lambda t: self._cw[t])
+        self._cw[best] -= total
+        return best
+
+    def _dispatch(self):
+        while self.inflight < self.limit:
+            tier = self._pick_tier()
+            if tier is None:
+                return
+            fut, _ = self.queues[tier].popleft()
+            if fut.done():  # 타임아웃/취소된 대기자
+                continue
+            self.inflight += 1
+            fut.set_result(True)
+
+    # ---- 획득/반납 ----
+    async def acquire(self, tier: str):
+        tier = tier if tier in TIERS else "free"
+        st = self.stats[tier]
+        if self.inflight < self.limit and not any(self.queues.values()):
+            self.inflight += 1
+            st.record_wait(0.0)
+            return
+
+        est = self._estimate_wait(tier)
+        if tier in ADMISSION_SHED_TIERS and est > ADMISSION_TARGET_WAIT_SEC:
+            st.shed += 1
+            raise AdmissionRejected(429, "OVERLOADED", max(1, math.ceil(est)))
+        if len(self.queues[tier]) >= ADMISSION_MAX_DEPTH:
+            st.shed += 1
+            raise AdmissionRejected(503, "QUEUE_FULL", max(1, math.ceil(est)))
+
+        fut = asyncio.get_running_loop().create_future()
+        entry = (fut, time.monotonic())
+        self.queues[tier].append(entry)
+        try:
+            await asyncio.wait_for(fut, timeout=MAX_WAIT_SEC[tier])
+        except asyncio.TimeoutError:
+            # 타임아웃과 같은 루프 회차에 _dispatch 가 이미 슬롯을 넘겼을 수 있음(3.12+) → 입장으로 처리
+            if not (fut.done() and not fut.cancelled()):
+                self._drop(tier, entry)
+                st.timed_out += 1
+                raise AdmissionRejected(503, "QUEUE_TIMEOUT", max(1, math.ceil(self._estimate_wait(tier))))
+        except asyncio.CancelledError:
+            # 대기 중 클라이언트 이탈 — 이미 슬롯을 받았으면 반납
+            if fut.done() and not fut.cancelled():
+                self.release()
+            else:
+                self._drop(tier, entry)
+            raise
+        st.record_wait(time.monotonic() - entry[1])
+
+    def _drop(self, tier: str, entry):
+        try:
+            self.queues[tier].remove(entry)
+        except ValueError:
+            pass
+
+    def release(self, service_sec: Optional[float] = None):
+        if service_sec is not None:
+            self.service_ewma = (1 - _ALPHA) * self.service_ewma + _ALPHA * service_sec
+        self.inflight = max(0, self.inflight - 1)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tier: str):
+        await self.acquire(tier)
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - t0)
+
+    # ---- 지표 ----
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "inflight": self.inflight,
+            "service_ewma_sec": round(self.service_ewma, 3),
+            "target_wait_sec": ADMISSION_TARGET_WAIT_SEC,
+            "tiers": {
+                t: {
+                    "depth": len(self.queues[t]),
+                    "weight": WEIGHTS[t],
+                    "max_wait_sec": MAX_WAIT_SEC[t],
+                    "wait_ewma_sec": round(self.stats[t].wait_ewma, 3),
+                    "wait_p95_sec": round(self.stats[t].p95(), 3),
+                    "admitted": self.stats[t].admitted,
+                    "shed": self.stats[t].shed,
+                    "timed_out": self.stats[t].timed_out,
+                }
+                for t in TIERS
+            },
+        }
+
+    def prometheus_text(self) -> str:
+        m = self.metrics()
+        lines: List[str] = [
+            f"gnom_admission_limit {m['limit']}",
+            f"gnom_admission_inflight {m['inflight']}",
+            f"gnom_admission_service_seconds {m['service_ewma_sec']}",
+        ]
+        for t, v in m["tiers"].items():
+            lines += [
+                f'gnom_admission_queue_depth{{tier="{t}"}} {v["depth"]}',
+                f'gnom_admission_wait_seconds_ewma{{tier="{t}"}} {v["wait_ewma_sec"]}',
+                f'gnom_admission_wait_seconds_p95{{tier="{t}"}} {v["wait_p95_sec"]}',
+                f'gnom_admission_admitted_total{{tier="{t}"}} {v["admitted"]}',
+                f'gnom_admission_shed_total{{tier="{t}"}} {v["shed"]}',
+                f'gnom_admission_timeout_total{{tier="{t}"}} {v["timed_out"]}',
+            ]
+        return "\n".join(lines) + "\n"
+
+
+ADMISSION = AdmissionController()
@@ -0,0 +1,36 @@
+# services/analysis_cache.py
+"""
+분석 결과 캐시.
+키 = (종류, 모델 라우트, 실제로 모델에 보낸 프롬프트 전문) 해시
+→ prompts/ 나 모델 구성이 바뀌면 키가 자동으로 달라져 이전 결과를 재사용하지 않음.
+"""
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+from typing import Any, Dict, Optional
+
+from dependencies import get_store
+from services import model_router
+
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600)))
+
+R = get_store()
+
+
+def cache_key(kind: str, system: str, user: str, route: Optional[str] = None) -> str:
+    raw = json.dumps([kind, route or model_router.route_id(), system, user], ensure_ascii=False)
+    return "acache:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    if not ANALYSIS_CACHE_ENABLED:
+        return None
+    return R.get_json(key)
+
+
+def put(key: str, result: Dict[str, Any]):
+    if ANALYSIS_CACHE_ENABLED:
+        R.set_json(key, result, ANALYSIS_CACHE_TTL)
@@ -7,6 +7,8 @@ import time
 from typing import Optional, Tuple, Dict, Any, List
 from datetime import datetime, timedelta, timezone
 
+from services import model_router, analysis_cache
+
 # ---- 타임존 & 토글 -----------------------------------------------------------
 KST = timezone(timedelta(hours=9))  # Asia/Seoul (DST 없음)
 LIMIT_ENABLED = os.getenv("ANALYZE_LIMIT_ENABLED", "false").lower() == "true"
@@ -31,6 +33,7 @@ if REDIS_URL:
 # v0 SDK (openai<1.0.0): import openai; openai.ChatCompletion.create(...)
 _OPENAI_CLIENT_V1 = None
 _OPENAI_LEGACY = None
+_OPENAI_V1 = False  # v1 SDK 설치 여부 (키 없이 로컬 엔드포인트만 쓰는 경우에도 라우터 사용)
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # 필요 시 바꾸세요
@@ -42,6 +45,7 @@ try:
     # v1
     from openai import OpenAI  # type: ignore
 
+    _OPENAI_V1 = True
     _OPENAI_CLIENT_V1 = OpenAI()
 except Exception:
     # v0
@@ -211,54 +215,103 @@ def _safe_parse_json(text: str) -> Dict[str, Any]:
 # =============================================================================
 # OpenAI 호출
 # =============================================================================
-def _call_openai(prompt: str) -> Dict[str, Any]:
+def model_ready() -> bool:
     """
-    v1, v0 SDK 모두 지원. 실패 시 예외 발생.
+    호출 가능한 모델이 있는지 (API 키 또는 MODEL_ROUTES 의 로컬 엔드포인트).
     """
-    if not OPENAI_API_KEY:
-        # 키가 없으면 더미 응답 (부팅/개발 안정성)
-        return {
-            "interpretation": "API 키 미설정 상태입니다. 예시 응답입니다.",
-            "insight": "환경변수 OPENAI_API_KEY를 설정하세요.",
-            "tags": ["시스템"],
-            "emojis": ["⚙️", "🧪", "🧩"],
-        }
+    if _OPENAI_V1:
+        return model_router.configured()
+    return bool(OPENAI_API_KEY)
+
+
+def _chat_text(prompt: str, max_tokens: int = 500, tier: str = "free") -> str:
+    """
+    v1, v0 SDK 모두 지원. 모델 원문 텍스트 반환. 실패 시 예외 발생.
+    v1 은 model_router 가 후보 모델 중 가장 빠른 정상 모델로 보냄.
+    """
+    messages = [
+        {"role": "system", "content": "You are a structured, safe Korean assistant."},
+        {"role": "user", "content": prompt},
+    ]
 
     # v1 SDK 우선
-    if _OPENAI_CLIENT_V1 is not None:
-        resp = _OPENAI_CLIENT_V1.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a structured, safe Korean assistant."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.4,
-            max_tokens=500,
-        )
-        text = resp.choices[0].message.content or ""
-        return _safe_parse_json(text)
+    if _OPENAI_V1:
+        return model_router.chat(messages, tier=tier, temperature=0.4, max_tokens=max_tokens)
 
     # v0 레거시
     if _OPENAI_LEGACY is not None:
         resp = _OPENAI_LEGACY.ChatCompletion.create(
             model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are a structured, safe Korean assistant."},
-                {"role": "user", "content": prompt},
-            ],
+            messages=messages,
             temperature=0.4,
-            max_tokens=500,
+            max_tokens=max_tokens,
         )
-        text = resp["choices"][0]["message"]["content"] or ""
-        return _safe_parse_json(text)
+        return resp["choices"][0]["message"]["content"] or ""
 
     raise RuntimeError("OpenAI SDK 초기화 실패: 라이브러리 로딩 불가")
 
 
+def _dummy_result() -> Dict[str, Any]:
+    # 키가 없으면 더미 응답 (부팅/개발 안정성)
+    return {
+        "interpretation": "API 키 미설정 상태입니다. 예시 응답입니다.",
+        "insight": "환경변수 OPENAI_API_KEY를 설정하세요.",
+        "tags": ["시스템"],
+        "emojis": ["⚙️", "🧪", "🧩"],
+    }
+
+
+def _call_openai(prompt: str, tier: str = "free") -> Dict[str, Any]:
+    """
+    v1, v0 SDK 모두 지원. 실패 시 예외 발생.
+    """
+    if not model_ready():
+        return _dummy_result()
+    return _safe_parse_json(_chat_text(prompt, tier=tier))
+
+
 # =============================================================================
 # 퍼블릭 서비스 API (라우터에서 import)
 # =============================================================================
-def analyze_emotion(message: str, relationship: str) -> Dict[str, Any]:
+def emotion_cache_key(message: str, relationship: str) -> str:
+    """
+    analyze_emotion 결과 캐시 키 — 프롬프트 전문 + 모델 구성 기준 (프롬프트가 바뀌면 키도 바뀜).
+    """
+    prompt = _build_prompt(message=message.strip(), relationship=relationship.strip())
+    return analysis_cache.cache_key("analyze_emotion", "", prompt)
+
+
+def analyze_emotion_strict(message: str, relationship: str, tier: str = "free") -> Dict[str, Any]:
+    """
+    analyze_emotion 과 같지만 모델/파싱 오류를 폴백으로 감추지 않고 그대로 올림.
+    (일괄 재분석처럼 레이트리밋/재시도를 직접 다루는 호출자용)
+    """
+    prompt = _build_prompt(message=message.strip(), relationship=relationship.strip())
+    result = _call_openai(prompt, tier=tier)
+    # 방어적 스키마 보정
+    return {
+        "interpretation": str(result.get("interpretation", "")),
+        "insight": str(result.get("insight", "")),
+        "tags": list(result.get("tags", []))[:3],
+        "emojis": list(result.get("emojis", []))[:3],
+    }
+
+
+def analyze_emotion_cached(message: str, relationship: str, tier: str = "free") -> Dict[str, Any]:
+    """
+    분석 캐시 조회 → 미스면 analyze_emotion_strict (오류는 그대로 올림) → 성공 결과만 캐시.
+    """
+    ckey = emotion_cache_key(message, relationship)
+    hit = analysis_cache.get(ckey)
+    if hit:
+        return hit
+    out = analyze_emotion_strict(message, relationship, tier=tier)
+    if model_ready():
+        analysis_cache.put(ckey, out)
+    return out
+
+
+def analyze_emotion(message: str, relationship: str, tier: str = "free") -> Dict[str, Any]:
     """
     프론트에서 기대하는 결과 형태(dict):
     {
@@ -276,16 +329,8 @@ def analyze_emotion(message: str, relationship: str) -> Dict[str, Any]:
             "emojis": ["⚠️", "✍️", "📩"],
         }
 
-    prompt = _build_prompt(message=message.strip(), relationship=relationship.strip())
     try:
-        result = _call_openai(prompt)
-        # 방어적 스키마 보정
-        return {
-            "interpretation": str(result.get("interpretation", "")),
-            "insight": str(result.get("insight", "")),
-            "tags": list(result.get("tags", []))[:3],
-            "emojis": list(result.get("emojis", []))[:3],
-        }
+        return analyze_emotion_cached(message, relationship, tier=tier)
     except Exception as e:
         # 모델/네트워크 오류 시 안전한 폴백
         return {
@@ -0,0 +1,232 @@
+# services/bulk_license.py
+"""
+대량 사용권 처리 (프로모션 티켓 지급 / 패스 활성화).
+
+입력 한 줄 = 작업 1개 (CSV 헤더 또는 JSONL 키):
+  op_id(선택), user_id, action(grant_ticket|activate_pass), amount(선택), days(선택)
+op_id 가 없으면 내용+줄번호 해시로 생성 → 같은 파일을 다시 돌려도 중복 지급 없음.
+
+CLI (서버의 관리자 API로 청크 단위 전송, 체크포인트로 이어하기):
+  python -m services.bulk_license promo.csv --url https://api.example.com --token $ADMIN_TOKEN
+"""
+from __future__ import annotations
+
+import csv
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "500"))
+
+
+# =============================================================================
+# 파싱
+# =============================================================================
+def _op_id(row: Dict[str, Any], lineno: int) -> str:
+    raw = f"{row.get('user_id')}|{row.get('action')}|{row.get('amount')}|{row.get('days')}|{lineno}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def normalize_op(row: Dict[str, Any], lineno: int) -> Optional[Dict[str, Any]]:
+    """
+    원본 행 → {"op_id","user_id","action","amount"|"days"}. 잘못된 행은 None.
+    """
+    user_id = str(row.get("user_id") or "").strip()
+    action = str(row.get("action") or "").strip()
+    if not user_id or action not in ("grant_ticket", "activate_pass"):
+        return None
+    op = {
+        "op_id": str(row.get("op_id") or "").strip() or _op_id(row, lineno),
+        "user_id": user_id,
+        "action": action,
+    }
+    try:
+        if action == "grant_ticket":
+            op["amount"] = int(row.get("amount") or 1)
+        else:
+            op["days"] = int(row.get("days") or row.get("amount") or 7)
+    except (TypeError, ValueError):
+        return None
+    return op
+
+
+def iter_rows(
+    lines: Iterable[str], fmt: str, start_line: int = 0
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    (줄번호, 정규화된 op 또는 None) 스트림. 줄번호는 start_line+1 부터(CSV 헤더 제외).
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for i, row in enumerate(reader, start=start_line + 1):
+            yield i, normalize_op(row, i)
+        return
+    i = start_line
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        i += 1
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        # 객체가 아닌 JSON([1,2], 123, "x")도 잘못된 행
+        yield i, normalize_op(row, i) if isinstance(row, dict) else None
+
+
+def guess_format(name: str) -> str:
+    return "csv" if name.lower().endswith(".csv") else "jsonl"
+
+
+# =============================================================================
+# 적재 (서버 측)
+# =============================================================================
+def apply_stream(
+    store, lines: Iterable[str], fmt: str, batch_size: int = BULK_BATCH_SIZE, start_line: int = 0
+) -> Dict[str, Any]:
+    """
+    줄 스트림을 batch_size 단위로 LicenseStore.apply_bulk 에 적용.
+    """
+    t0 = time.perf_counter()
+    total = {"applied": 0, "duplicate": 0, "invalid": 0, "lines": 0}
+    batch: List[Dict[str, Any]] = []
+
+    def _flush():
+        res = store.apply_bulk(batch)
+        for k in ("applied", "duplicate", "invalid"):
+            total[k] += res[k]
+        batch.clear()
+
+    for _, op in iter_rows(lines, fmt, start_line):
+        total["lines"] += 1
+        if op is None:
+            total["invalid"] += 1
+            continue
+        batch.append(op)
+        if len(batch) >= batch_size:
+            _flush()
+    if batch:
+        _flush()
+
+    elapsed = time.perf_counter() - t0
+    total["elapsed_sec"] = round(elapsed, 3)
+    total["ops_per_sec"] = round(total["lines"] / elapsed, 1) if elapsed > 0 else None
+    return total
+
+
+# =============================================================================
+# CLI (클라이언트 측)
+# =============================================================================
+def _read_checkpoint(path: str) -> int:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return int(json.load(f).get("line", 0))
+    except Exception:
+        return 0
+
+
+def _write_checkpoint(path: str, line: int):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"line": line, "ts": int(time.time())}, f)
+    os.replace(tmp, path)
+
+
+def _chunks(path: str, fmt: str, start_line: int, size: int) -> Iterator[Tuple[int, str]]:
+    """
+    (청크 마지막 줄번호, 전송 본문). op_id 가 줄번호에 의존하므로 JSONL 로 정규화해서 보냄.
+    """
+    buf: List[str] = []
+    last = start_line
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for lineno, op in iter_rows(f, fmt):
+            if lineno <= start_line:
+                continue
+            last = lineno
+            buf.append(json.dumps(op, ensure_ascii=False) if op else "{}")
+            if len(buf) >= size:
+                yield last, "\n".join(buf)
+                buf = []
+    if buf:
+        yield last, "\n".join(buf)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+
+    ap = argparse.ArgumentParser(description="Gnom 대량 사용권 처리")
+    ap.add_argument("path", help="CSV 또는 JSONL 파일")
+    ap.add_argument("--url", default=os.getenv("GNOM_API_URL", "http://localhost:8000"))
+    ap.add_argument("--token", default=os.getenv("ADMIN_TOKEN", ""))
+    ap.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    ap.add_argument("--batch", type=int, default=BULK_BATCH_SIZE)
+    ap.add_argument("--inflight", type=int, default=4, help="동시에 전송할 청크 수(파이프라인 깊이)")
+    ap.add_argument("--checkpoint", default=None, help="기본: <path>.ckpt")
+    ap.add_argument("--restart", action="store_true", help="체크포인트 무시하고 처음부터")
+    args = ap.parse_args(argv)
+
+    fmt = args.format or guess_format(args.path)
+    ckpt = args.checkpoint or args.path + ".ckpt"
+    start = 0 if args.restart else _read_checkpoint(ckpt)
+    endpoint = args.url.rstrip("/") + "/admin/license/bulk?fmt=jsonl"
+    headers = {"X-Admin-Token": args.token, "Content-Type": "application/x-ndjson"}
+    session = requests.Session()
+
+    def _send(body: str) -> Dict[str, Any]:
+        # 연결 오류/타임아웃/5xx 만 재시도. 4xx(잘못된 토큰, 형식 오류)는 재시도해도 같으므로 즉시 실패
+        for attempt in range(5):
+            try:
+                r = session.post(endpoint, data=body.encode("utf-8"), headers=headers, timeout=60)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == 4:
+                    raise
+            else:
+                if r.status_code < 500:
+                    r.raise_for_status()
+                    return r.json()
+            if attempt < 4:
+                time.sleep(2 ** attempt)
+        raise RuntimeError("bulk endpoint unavailable")
+
+    if start:
+        print(f"[bulk] resume from line {start}", file=sys.stderr)
+
+    total = {"applied": 0, "duplicate": 0, "invalid": 0, "lines": 0}
+    t0 = time.perf_counter()
+    pending: List[Tuple[int, Any]] = []
+    with ThreadPoolExecutor(max_workers=max(1, args.inflight)) as ex:
+        def _drain(keep: int):
+            # 앞 청크부터 완료 확인 → 연속 완료 지점까지만 체크포인트 전진
+            while len(pending) > keep:
+                last, fut = pending.pop(0)
+                res = fut.result()
+                for k in total:
+                    total[k] += res.get(k, 0)
+                _write_checkpoint(ckpt, last)
+                el = time.perf_counter() - t0
+                print(
+                    f"[bulk] line {last}  applied={total['applied']} dup={total['duplicate']} "
+                    f"invalid={total['invalid']}  {total['lines'] / el:.0f} ops/s",
+                    file=sys.stderr,
+                )
+
+        for last, body in _chunks(args.path, fmt, start, args.batch):
+            pending.append((last, ex.submit(_send, body)))
+            _drain(args.inflight)
+        _drain(0)
+
+    el = time.perf_counter() - t0
+    total["elapsed_sec"] = round(el, 3)
+    total["ops_per_sec"] = round(total["lines"] / el, 1) if el > 0 else None
+    print(json.dumps(total, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# services/card_render.py
+"""
+감정 카드 이미지 렌더러 (Pillow).
+- ProcessPoolExecutor 에서 실행되므로 모듈 최상위 함수 + 피클 가능한 인자만 사용.
+- 한글 폰트는 CARD_FONT_PATH 또는 시스템 CJK 폰트(Noto Sans CJK / 나눔고딕) 필수.
+  Pillow 기본 폰트는 한글 글리프가 없어 폴백하지 않음 → 폰트가 없으면 FontMissing
+  (이미지 엔드포인트만 503, 나머지 API 는 영향 없음).
+- 이모지 폰트(CARD_EMOJI_FONT_PATH)가 없으면 이모지 줄은 그리지 않음.
+"""
+from __future__ import annotations
+
+import io
+import os
+import textwrap
+from functools import lru_cache
+from typing import Any, Dict
+
+CARD_FONT_PATH = os.getenv("CARD_FONT_PATH", "")
+CARD_EMOJI_FONT_PATH = os.getenv("CARD_EMOJI_FONT_PATH", "")
+
+# CARD_FONT_PATH 미지정 시 찾아볼 시스템 폰트 (fonts-noto-cjk / fonts-nanum 패키지)
+_FONT_CANDIDATES = (
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+    "C:/Windows/Fonts/malgun.ttf",
+)
+
+SIZES = {
+    "card": (1080, 1350),  # 공유용 세로 카드
+    "og": (1200, 630),     # OG 미리보기
+}
+
+# 카테고리별 배경/포인트 색
+PALETTE = {
+    "슬픔": ((36, 52, 92), (142, 172, 230)),
+    "분노": ((92, 30, 36), (240, 128, 112)),
+    "거리두기": ((44, 52, 60), (160, 176, 188)),
+    "관계심리": ((104, 44, 72), (250, 164, 196)),
+    "혼란": ((70, 50, 96), (196, 160, 236)),
+    "사과/후회": ((40, 72, 64), (150, 220, 190)),
+}
+DEFAULT_COLORS = ((32, 34, 44), (186, 196, 255))
+
+
+class FontMissing(RuntimeError):
+    pass
+
+
+@lru_cache(maxsize=1)
+def font_path() -> str:
+    """
+    한글 글리프가 있는 폰트 경로. 없으면 FontMissing (실패는 캐시 안 됨 → 폰트 설치 후 재시작 없이 복구).
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    def _glyph(f, ch: str) -> bytes:
+        im = Image.new("L", (48, 48))
+        ImageDraw.Draw(im).text((4, 4), ch, font=f, fill=255)
+        return im.tobytes()
+
+    paths = (CARD_FONT_PATH,) if CARD_FONT_PATH else _FONT_CANDIDATES
+    for p in paths:
+        if not os.path.exists(p):
+            continue
+        f = ImageFont.truetype(p, 32)
+        # 글리프가 없으면 .notdef(두부)로 그려짐 → 확실히 없는 코드포인트와 같은 모양이면 불합격
+        if _glyph(f, "가") != _glyph(f, "\U0010FFFD"):
+            return p
+    raise FontMissing(
+        "CARD_FONT_MISSING: 한글 폰트가 없습니다. CARD_FONT_PATH 를 지정하거나 fonts-noto-cjk 를 설치하세요."
+        + (f" (CARD_FONT_PATH={CARD_FONT_PATH})" if CARD_FONT_PATH else "")
+    )
+
+
+def check_fonts():
+    font_path()
+
+
+def _font(size: int, path: str = ""):
+    from PIL import ImageFont
+
+    return ImageFont.truetype(path or font_path(), size)
+
+
+def render_card(spec: Dict[str, Any], fmt: str = "png", layout: str = "card") -> bytes:
+    """
+    spec: {"title", "insight", "interpretation", "tags", "emojis", "card": {"name","category","description"}}
+    → 이미지 bytes (png | webp)
+    """
+    from PIL import Image, ImageDraw
+
+    w, h = SIZES.get(layout, SIZES["card"])
+    card = spec.get("card") or {}
+    bg, accent = PALETTE.get(card.get("category", ""), DEFAULT_COLORS)
+
+    img = Image.new("RGB", (w, h), bg)
+    d = ImageDraw.Draw(img)
+    pad = w // 14
+    y = pad
+
+    emojis = " ".join(spec.get("emojis", [])[:3])
+    if emojis and CARD_EMOJI_FONT_PATH:
+        ef = _font(w // 10, CARD_EMOJI_FONT_PATH)
+        d.text((pad, y), emojis, font=ef, fill=accent, embedded_color=True)
+        y += w // 10 + pad // 2
+
+    title = spec.get("title") or card.get("name") or ""
+    if title:
+        tf = _font(w // 18)
+        d.text((pad, y), title, font=tf, fill=(255, 255, 255))
+        y += w // 18 + pad // 2
+
+    # 본문 폭은 대략 (가용 폭 / 글자 크기) 글자 수로 줄바꿈
+    body_size = w // 30
+    per_line = max(8, (w - pad * 2) // body_size)
+    bf = _font(body_size)
+    body = spec.get("insight") or spec.get("interpretation") or card.get("description") or ""
+    # 하단 태그/서명 줄(h - pad - body_size) 위까지 들어가는 줄 수만 — 넘치면 마지막 줄 말줄임
+    step = int(body_size * 1.5)
+    bottom = h - pad - body_size - pad // 3
+    max_rows = max(0, (bottom - y - body_size) // step + 1)
+    lines = textwrap.wrap(body, per_line)
+    if len(lines) > max_rows > 0:
+        lines = lines[:max_rows]
+        lines[-1] = lines[-1][: per_line - 1].rstrip() + "…"
+    for line in lines[:max_rows]:
+        d.text((pad, y), line, font=bf, fill=(236, 236, 240))
+        y += step
+
+    tags = spec.get("tags", [])[:3]
+    if tags:
+        gf = _font(body_size)
+        d.text((pad, h - pad - body_size), "  ".join(f"#{t}" for t in tags), font=gf, fill=accent)
+
+    d.text((w - pad - body_size * 4, h - pad - body_size), "Gnom AI", font=_font(body_size), fill=accent)
+
+    buf = io.BytesIO()
+    if fmt == "webp":
+        img.save(buf, format="WEBP", quality=85, method=4)
+    else:
+        img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
@@ -0,0 +1,249 @@
+# services/card_service.py
+"""
+서버 사이드 감정 카드 이미지.
+- 분석 결과(tags/emojis) → emotion_card_full.json 카드 매칭
+- 렌더는 프로세스 풀(이벤트 루프 블로킹 없음)
+- 입력 해시 기반 캐시: 메모리 LRU → 디스크 → 렌더 순
+- 디스크 캐시는 최대 보존 기간(CARD_DISK_CACHE_DAYS) + 총량(CARD_DISK_CACHE_BYTES) 상한,
+  초과분은 오래 안 쓰인(mtime) 파일부터 삭제 — 읽을 때 mtime 갱신
+"""
+from __future__ import annotations
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.card_render import render_card, check_fonts, FontMissing, SIZES
+
+# ---- 설정 --------------------------------------------------------------------
+ROOT = Path(__file__).resolve().parent.parent
+CARDS_JSON = Path(os.getenv("EMOTION_CARDS_PATH", ROOT / "emotion_card_full.json"))
+CARD_CACHE_DIR = Path(os.getenv("CARD_CACHE_DIR", ROOT / "data" / "cards"))
+CARD_MEM_CACHE_BYTES = int(os.getenv("CARD_MEM_CACHE_BYTES", str(32 * 1024 * 1024)))
+CARD_RENDER_PROCS = int(os.getenv("CARD_RENDER_PROCS", "2"))
+CARD_DISK_CACHE_BYTES = int(os.getenv("CARD_DISK_CACHE_BYTES", str(512 * 1024 * 1024)))
+CARD_DISK_CACHE_DAYS = int(os.getenv("CARD_DISK_CACHE_DAYS", "30"))  # 공유 보존 기간과 맞춤
+CARD_DISK_PRUNE_EVERY = int(os.getenv("CARD_DISK_PRUNE_EVERY", "200"))  # 디스크 쓰기 N회마다 정리
+RENDER_VERSION = "2"  # 레이아웃 바뀌면 올려서 캐시 무효화
+
+MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+
+_proc_pool: Optional[ProcessPoolExecutor] = None
+_inflight: Dict[str, asyncio.Future] = {}
+_disk_writes = 0
+
+
+# =============================================================================
+# 카드 매칭
+# =============================================================================
+@lru_cache(maxsize=1)
+def load_cards() -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(CARDS_JSON, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def match_card(tags: List[str], emojis: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    카드 키는 "😢 슬픔" 형태. 태그 → 키워드/카테고리, 이모지 → 키 앞 이모지 순으로 매칭.
+    """
+    cards = load_cards()
+    by_word = {k.split(" ", 1)[-1].replace(" ", ""): k for k in cards}
+    by_emoji = {k.split(" ", 1)[0]: k for k in cards}
+
+    key = None
+    for t in tags:
+        t = str(t).replace(" ", "")
+        if t in by_word:
+            key = by_word[t]
+            break
+    if key is None:
+        for t in tags:
+            key = next((k for k, v in cards.items() if v.get("category") == t), None)
+            if key:
+                break
+    if key is None:
+        key = next((by_emoji[e] for e in emojis if e in by_emoji), None)
+    if key is None:
+        return None
+    return {"name": key, **cards[key]}
+
+
+# =============================================================================
+# 캐시
+# =============================================================================
+class _LRUBytes:
+    """
+    바이트 총량 상한 LRU.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.data: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        v = self.data.get(key)
+        if v is not None:
+            self.data.move_to_end(key)
+        return v
+
+    def put(self, key: str, val: bytes):
+        if len(val) > self.max_bytes:
+            return
+        old = self.data.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.data[key] = val
+        self.size += len(val)
+        while self.size > self.max_bytes:
+            _, ev = self.data.popitem(last=False)
+            self.size -= len(ev)
+
+
+_MEM = _LRUBytes(CARD_MEM_CACHE_BYTES)
+
+
+def build_spec(
+    title: str = "",
+    interpretation: str = "",
+    insight: str = "",
+    tags: Optional[List[str]] = None,
+    emojis: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    tags = [str(t) for t in (tags or [])][:3]
+    emojis = [str(e) for e in (emojis or [])][:3]
+    return {
+        "title": title or "",
+        "interpretation": interpretation or "",
+        "insight": insight or "",
+        "tags": tags,
+        "emojis": emojis,
+        "card": match_card(tags, emojis),
+    }
+
+
+def spec_hash(spec: Dict[str, Any], fmt: str, layout: str) -> str:
+    raw = json.dumps({"s": spec, "f": fmt, "l": layout, "v": RENDER_VERSION}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _disk_path(h: str, fmt: str) -> Path:
+    return CARD_CACHE_DIR / h[:2] / f"{h}.{fmt}"
+
+
+# =============================================================================
+# 렌더
+# =============================================================================
+def _pool() -> ProcessPoolExecutor:
+    global _proc_pool
+    if _proc_pool is None:
+        _proc_pool = ProcessPoolExecutor(max_workers=CARD_RENDER_PROCS)
+    return _proc_pool
+
+
+async def render_card_image(spec: Dict[str, Any], fmt: str = "png", layout: str = "card") -> Tuple[bytes, str]:
+    """
+    (이미지 bytes, media_type). 같은 입력이 동시에 들어오면 렌더는 한 번만.
+    """
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"unsupported format: {fmt}")
+    if layout not in SIZES:
+        raise ValueError(f"unsupported layout: {layout}")
+
+    h = spec_hash(spec, fmt, layout)
+    hit = _MEM.get(h)
+    if hit is not None:
+        return hit, MEDIA_TYPES[fmt]
+
+    path = _disk_path(h, fmt)
+    if path.exists():
+        data = await asyncio.to_thread(_read_disk, path)
+        _MEM.put(h, data)
+        return data, MEDIA_TYPES[fmt]
+
+    # 한글 폰트 없이 렌더하면 두부 이미지가 immutable 캐시로 나감 → 렌더/캐시 전에 FontMissing
+    await asyncio.to_thread(check_fonts)
+
+    fut = _inflight.get(h)
+    if fut is None:
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(_pool(), render_card, spec, fmt, layout)
+        _inflight[h] = fut
+        try:
+            data = await fut
+        finally:
+            _inflight.pop(h, None)
+        _MEM.put(h, data)
+        await asyncio.to_thread(_write_disk, path, data)
+        _count_disk_write()
+    else:
+        data = await fut
+    return data, MEDIA_TYPES[fmt]
+
+
+def _read_disk(path: Path) -> bytes:
+    data = path.read_bytes()
+    try:
+        os.utime(path)  # 최근 사용 표시 (정리 순서 기준)
+    except OSError:
+        pass
+    return data
+
+
+def _count_disk_write():
+    global _disk_writes
+    _disk_writes += 1
+    if (_disk_writes - 1) % CARD_DISK_PRUNE_EVERY == 0:  # 첫 쓰기 + 이후 N회마다
+        asyncio.get_running_loop().run_in_executor(None, prune_disk_cache)
+
+
+def prune_disk_cache() -> Dict[str, int]:
+    """
+    보존 기간 지난 파일 삭제 → 총량이 상한을 넘으면 mtime 오래된 순으로 상한의 90% 까지 삭제.
+    """
+    cutoff = time.time() - CARD_DISK_CACHE_DAYS * 86400
+    files = []
+    removed = 0
+    for p in CARD_CACHE_DIR.glob("*/*"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        if st.st_mtime < cutoff:
+            p.unlink(missing_ok=True)
+            removed += 1
+        else:
+            files.append((st.st_mtime, st.st_size, p))
+    total = sum(sz for _, sz, _ in files)
+    if total > CARD_DISK_CACHE_BYTES:
+        files.sort(key=lambda x: x[0])
+        for _, sz, p in files:
+            if total <= CARD_DISK_CACHE_BYTES * 0.9:
+                break
+            p.unlink(missing_ok=True)
+            total -= sz
+            removed += 1
+    return {"removed": removed, "bytes": total}
+
+
+def _write_disk(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def shutdown():
+    global _proc_pool
+    if _proc_pool is not None:
+        _proc_pool.shutdown(wait=False, cancel_futures=True)
+        _proc_pool = None
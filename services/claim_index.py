@@ -0,0 +1,196 @@
+# services/claim_index.py
+"""
+공유 보상(claim) 인덱스.
+
+- share_id: 시간 정렬 가능한 짧은 ID (base62, 일수 + ms + 랜덤) — uuid4(36자) 대신 15자
+- share:/claim: 키는 보존 기간(SHARE_RETENTION_DAYS) TTL
+  → 메모리 절감은 TTL(무한 누적 제거)에서 나옴. 건당 메모리는 만료 힙 항목 때문에 오히려 약간 큼
+- (옵트인, CLAIM_BLOOM_ENABLED=true) 일 단위 파티션별 Bloom 필터:
+  "확실히 미수령"은 저장소 조회 없이 판정, "있을 수도"일 때만 claim:{share_id} 조회.
+  claim: 키는 그대로 저장하므로 메모리는 오히려 늘고, 저장소가 같은 프로세스 dict(MemoryStore)면
+  조회도 더 느림(benchmarks/claim_index_bench.py). 저장소가 원격(왕복 비용 있음)일 때만 켤 것.
+
+주의: Bloom 필터는 프로세스 메모리에 있음. 여러 프로세스가 원격 저장소를 공유하면
+      프로세스마다 자기가 기록한 claim 만 필터에 있으므로 필터도 공유 저장소(비트 연산)로 옮겨야 함.
+"""
+from __future__ import annotations
+
+import os
+import math
+import time
+import secrets
+import threading
+from typing import Dict, List, Optional
+
+SHARE_RETENTION_DAYS = int(os.getenv("SHARE_RETENTION_DAYS", "30"))
+SHARE_CLAIMS_PER_DAY = int(os.getenv("SHARE_CLAIMS_PER_DAY", "200000"))  # 파티션당 예상 원소 수
+CLAIM_BLOOM_FP = float(os.getenv("CLAIM_BLOOM_FP", "0.01"))
+CLAIM_BLOOM_ENABLED = os.getenv("CLAIM_BLOOM_ENABLED", "false").lower() == "true"
+PARTITION_SEC = 24 * 3600
+
+_B62 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_B62_IDX = {c: i for i, c in enumerate(_B62)}
+_DAY_LEN = 3   # 에포크 이후 일수 (62^3 일 ≈ 650년) — 파티션 키 = share_id[:3]
+_MS_LEN = 5    # 하루 안의 ms (62^5 > 86,400,000)
+_RAND_LEN = 7  # 62^7 ≈ 3.5e12 — 같은 ms 안 충돌 무시 가능
+_ID_LEN = _DAY_LEN + _MS_LEN + _RAND_LEN
+
+
+# =============================================================================
+# share_id
+# =============================================================================
+def _b62(n: int, width: int) -> str:
+    out = []
+    for _ in range(width):
+        n, r = divmod(n, 62)
+        out.append(_B62[r])
+    return "".join(reversed(out))
+
+
+def _unb62(s: str) -> Optional[int]:
+    n = 0
+    for ch in s:
+        i = _B62_IDX.get(ch)
+        if i is None:
+            return None
+        n = n * 62 + i
+    return n
+
+
+def new_share_id(now_ms: Optional[int] = None) -> str:
+    """
+    [일수 3][일 내 ms 5][랜덤 7] — 사전순 = 생성 시각순, 앞 3자로 파티션 판정.
+    """
+    ts = int(time.time() * 1000) if now_ms is None else now_ms
+    day, ms = divmod(ts, PARTITION_SEC * 1000)
+    return _b62(day, _DAY_LEN) + _b62(ms, _MS_LEN) + "".join(secrets.choice(_B62) for _ in range(_RAND_LEN))
+
+
+def _is_new_id(share_id: str) -> bool:
+    return len(share_id) == _ID_LEN and "-" not in share_id
+
+
+def share_id_ts(share_id: str) -> Optional[float]:
+    """
+    share_id 에 들어 있는 생성 시각(초). 예전 uuid 형식이면 None.
+    """
+    if not _is_new_id(share_id):
+        return None
+    day = _unb62(share_id[:_DAY_LEN])
+    ms = _unb62(share_id[_DAY_LEN:_DAY_LEN + _MS_LEN])
+    if day is None or ms is None:
+        return None
+    return (day * PARTITION_SEC * 1000 + ms) / 1000
+
+
+def ttl_for(share_id: str) -> int:
+    """
+    share:/claim: 키 TTL — 생성 시각 기준 보존 기간이 끝날 때까지.
+    """
+    ts = share_id_ts(share_id) or time.time()
+    return max(60, int(ts + SHARE_RETENTION_DAYS * 86400 - time.time()))
+
+
+# =============================================================================
+# Bloom 필터
+# =============================================================================
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float):
+        m = max(64, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.m = m
+        self.k = max(1, round(m / capacity * math.log(2)))
+        self.bits = bytearray((m + 7) // 8)
+
+    def _idx(self, key: str) -> List[int]:
+        # Kirsch–Mitzenmacher 이중 해싱. 필터가 프로세스 메모리에만 있으므로
+        # 프로세스마다 시드가 다른 내장 hash() 를 써도 됨(암호 해시보다 훨씬 빠름).
+        h1 = hash(key)
+        h2 = hash((key, 1)) | 1
+        m = self.m
+        return [(h1 + i * h2) % m for i in range(self.k)]
+
+    def add(self, key: str):
+        bits = self.bits
+        for i in self._idx(key):
+            bits[i >> 3] |= 1 << (i & 7)
+
+    def __contains__(self, key: str) -> bool:
+        # 음성 판정이 대부분이라 위치를 하나씩 계산하며 조기 종료
+        bits, m = self.bits, self.m
+        h1 = hash(key)
+        h2 = hash((key, 1)) | 1
+        for _ in range(self.k):
+            i = h1 % m
+            if not bits[i >> 3] & (1 << (i & 7)):
+                return False
+            h1 += h2
+        return True
+
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+
+# =============================================================================
+# 인덱스
+# =============================================================================
+class ClaimIndex:
+    """
+    R: get/set 을 가진 스토어 (dependencies.MemoryStore 등)
+    """
+    def __init__(self, store, capacity: int = SHARE_CLAIMS_PER_DAY, fp_rate: float = CLAIM_BLOOM_FP,
+                 retention_days: int = SHARE_RETENTION_DAYS, bloom: bool = CLAIM_BLOOM_ENABLED):
+        self.R = store
+        self.bloom = bloom
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.retention_days = retention_days
+        self.parts: Dict[str, BloomFilter] = {}  # 파티션 키(share_id 앞 3자) → 필터
+        self.lock = threading.Lock()
+        self.bloom_negative = 0  # 저장소 조회 없이 끝난 판정 수
+        self.exact_lookups = 0
+
+    def _part(self, share_id: str) -> Optional[str]:
+        return share_id[:_DAY_LEN] if _is_new_id(share_id) else None
+
+    def _rotate(self):
+        # 파티션 키는 고정 폭 base62 라 문자열 비교 = 날짜 비교
+        oldest = _b62(int(time.time() // PARTITION_SEC) - self.retention_days, _DAY_LEN)
+        for p in [p for p in self.parts if p < oldest]:
+            del self.parts[p]
+
+    def expired(self, share_id: str) -> bool:
+        ts = share_id_ts(share_id)
+        return ts is not None and time.time() - ts > self.retention_days * 86400
+
+    def is_claimed(self, share_id: str) -> bool:
+        p = self._part(share_id) if self.bloom else None
+        if p is not None:
+            bf = self.parts.get(p)
+            if bf is None or share_id not in bf:
+                self.bloom_negative += 1
+                return False
+        # Bloom "있을 수도" 또는 예전 uuid 형식 → 정확 저장소 확인
+        self.exact_lookups += 1
+        return self.R.get(f"claim:{share_id}") is not None
+
+    def mark_claimed(self, share_id: str, user_id: str):
+        # 저장소 먼저 기록 → 필터 추가 (필터에만 있고 저장소에 없는 상태는 오탐일 뿐 안전)
+        self.R.set(f"claim:{share_id}", user_id, ttl_for(share_id))
+        p = self._part(share_id) if self.bloom else None
+        if p is None:
+            return
+        with self.lock:
+            bf = self.parts.get(p)
+            if bf is None:
+                bf = self.parts[p] = BloomFilter(self.capacity, self.fp_rate)
+                self._rotate()
+            bf.add(share_id)
+
+    def stats(self) -> dict:
+        return {
+            "bloom": self.bloom,
+            "partitions": len(self.parts),
+            "bloom_bytes": sum(bf.nbytes() for bf in self.parts.values()),
+            "bloom_negative": self.bloom_negative,
+            "exact_lookups": self.exact_lookups,
+        }
@@ -0,0 +1,106 @@
+# services/fake_llm.py
+"""
+OpenAI 호환 로컬 가짜 서버 (오프라인 라우팅/부하 테스트용, 표준 라이브러리만 사용).
+
+  python -m services.fake_llm --port 8787 --latency 0.3 --jitter 0.2 --error-rate 0.05
+
+MODEL_ROUTES 에 {"name": "local", "model": "fake", "base_url": "http://127.0.0.1:8787/v1", "api_key": "local"}
+
+응답 형식은 프롬프트가 요구하는 것을 따름:
+  JSON 스키마를 요구하면 JSON (analyze_emotion / 스레드 — per_message 포함)
+  '감정해석:' 라벨 스키마면 라벨 줄 (POST /analyze 의 prompts/schema.md)
+  둘 다 아니면 일반 텍스트 (리포트 개요)
+"""
+from __future__ import annotations
+
+import json
+import time
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED = {
+    "interpretation": "로컬 가짜 모델 응답입니다. 메시지의 정서는 중립에 가깝습니다.",
+    "insight": "실제 모델 없이 라우팅을 점검하는 중입니다.",
+    "tags": ["테스트"],
+    "emojis": ["🧪", "🤖", "🧩"],
+    "summary": "로컬 테스트 요약",
+}
+
+
+def _reply(prompt: str) -> str:
+    if "JSON" in prompt:
+        body = dict(CANNED)
+        if "per_message" in prompt:
+            body["per_message"] = [{"interpretation": "로컬 가짜 맥락 해석입니다.", "tags": ["테스트"]}] * 8
+        return json.dumps(body, ensure_ascii=False)
+    if "감정해석" in prompt:
+        return (
+            f"감정해석: {CANNED['interpretation']}\n"
+            f"한 줄 통찰: {CANNED['insight']}\n"
+            f"감정 분류: {','.join(CANNED['tags'])}\n"
+            f"이모지: {' '.join(CANNED['emojis'])}"
+        )
+    return CANNED["interpretation"]
+
+
+def make_handler(latency: float, jitter: float, error_rate: float):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):  # 조용히
+            pass
+
+        def _send(self, code: int, body: dict):
+            raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_POST(self):
+            n = int(self.headers.get("Content-Length") or 0)
+            req = json.loads(self.rfile.read(n) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                return self._send(404, {"error": {"message": "not found"}})
+
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            if random.random() < error_rate:
+                return self._send(503, {"error": {"message": "fake overload", "type": "server_error"}})
+
+            prompt = "".join(m.get("content", "") for m in req.get("messages", []))
+            content = _reply(prompt)
+            self._send(200, {
+                "id": f"fake-{int(time.time() * 1000)}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": req.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 2,
+                    "completion_tokens": len(content) // 2,
+                    "total_tokens": (len(prompt) + len(content)) // 2,
+                },
+            })
+
+    return Handler
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="OpenAI 호환 가짜 서버")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8787)
+    ap.add_argument("--latency", type=float, default=0.2, help="평균 응답 지연(초)")
+    ap.add_argument("--jitter", type=float, default=0.05)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    args = ap.parse_args(argv)
+    srv = ThreadingHTTPServer((args.host, args.port), make_handler(args.latency, args.jitter, args.error_rate))
+    print(f"fake LLM on http://{args.host}:{args.port}/v1")
+    srv.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# services/fastjson.py
+"""
+빠른 JSON 경로 (옵트인: FAST_JSON=true, orjson 필요).
+
+- default_response_class(): FastAPI 기본 응답 클래스 → ORJSONResponse
+- raw_json(obj): 라우터가 dict 대신 바로 Response 반환 → jsonable_encoder/응답 모델 검증 생략
+- OK_RESPONSE: {"ok": true} 를 미리 직렬화한 바이트
+- dumps/loads: 스토어(set_json/get_json) 코덱
+orjson 이 없거나 FAST_JSON=false 면 전부 표준 json 경로로 동작.
+"""
+from __future__ import annotations
+
+import os
+import json
+from typing import Any
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true" and orjson is not None
+
+_OK_BYTES = b'{"ok":true}'
+
+
+def dumps(obj: Any) -> str:
+    if FAST_JSON:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
+def loads(raw: str | bytes) -> Any:
+    if FAST_JSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def default_response_class():
+    from fastapi.responses import JSONResponse, ORJSONResponse
+
+    return ORJSONResponse if FAST_JSON else JSONResponse
+
+
+def raw_json(obj: Any, status_code: int = 200):
+    """
+    이미 JSON 호환인 dict(str/int/bool/list 만)를 검증/인코더 없이 바로 응답.
+    FAST_JSON=false 면 dict 그대로 반환 → 기존 FastAPI 경로.
+    """
+    if not FAST_JSON:
+        return obj
+    from starlette.responses import Response
+
+    return Response(content=orjson.dumps(obj), status_code=status_code, media_type="application/json")
+
+
+def ok_response():
+    if not FAST_JSON:
+        return {"ok": True}
+    from starlette.responses import Response
+
+    return Response(content=_OK_BYTES, media_type="application/json")
@@ -1,9 +1,21 @@
 # services/license_service.py
 import datetime as dt
+import json
+import threading
+import uuid
 from typing import Optional, Tuple
 
 from dependencies import get_store
 
+BULK_ACTIONS = ("grant_ticket", "activate_pass")
+BULK_OP_TTL = 90 * 24 * 3600  # 처리된 op_id 기억 기간(멱등성)
+RESERVATION_TTL = 300  # 예약이 이 시간 안에 확정/취소되지 않으면 소비된 것으로 간주
+
+# 프로세스 내 읽기-수정-쓰기 구간 보호 (라우터마다 LicenseStore 인스턴스가 따로 있어 모듈 단위 락)
+# 사용권 카운터(free/ticket/pass_until/sharecnt)를 바꾸는 모든 경로가 이 락 안에서 실행됨.
+# 재진입 가능(grant_share_daily → grant_ticket).
+_LOCK = threading.RLock()
+
 def _today_str(tz: dt.tzinfo | None = None) -> str:
     return dt.datetime.now(tz).strftime("%Y%m%d")
 
@@ -53,10 +65,11 @@ class LicenseStore:
     # ---- 초기 지급 ----
     def bootstrap(self, user_id: str, free_default: int = 2):
         key = self._k(user_id, "boot")
-        if self.R.get(key):
-            return
-        self._set_int(self._k(user_id, "free"), free_default)
-        self.R.set(key, "1")
+        with _LOCK:
+            if self.R.get(key):
+                return
+            self._set_int(self._k(user_id, "free"), free_default)
+            self.R.set(key, "1")
 
     # ---- 소비/검증 ----
     def has_token(self, user_id: str) -> bool:
@@ -65,35 +78,138 @@ class LicenseStore:
 
     def consume_one(self, user_id: str) -> bool:
         # 패스 우선 소모 X (패스는 카운트 안 줄음) → free → ticket 순
+        with _LOCK:
+            return self._take(user_id) is not None
+
+    def _take(self, user_id: str) -> Optional[str]:
+        # 차감한 종류 반환: "pass" | "free" | "ticket" | None(사용권 없음). _LOCK 안에서 호출.
         st = self.status(user_id)
         if st["pass_active"]:
-            return True
+            return "pass"
         if st["free"] > 0:
             self._set_int(self._k(user_id, "free"), st["free"] - 1)
-            return True
+            return "free"
         if st["ticket"] > 0:
             self._set_int(self._k(user_id, "ticket"), st["ticket"] - 1)
+            return "ticket"
+        return None
+
+    # ---- 예약(2단계 소비): 분석 성공 시 commit, 실패/캐시 적중 시 release ----
+    def reserve(self, user_id: str) -> Optional[str]:
+        """
+        사용권 1개를 미리 차감하고 예약 id 반환. 사용권 없으면 None.
+        """
+        with _LOCK:
+            kind = self._take(user_id)
+            if kind is None:
+                return None
+            rid = uuid.uuid4().hex
+            self.R.set(f"resv:{rid}", json.dumps({"user_id": user_id, "kind": kind}), RESERVATION_TTL)
+            return rid
+
+    def commit(self, rid: Optional[str]):
+        if rid:
+            self.R.delete(f"resv:{rid}")
+
+    def release(self, rid: Optional[str]) -> bool:
+        """
+        예약 취소 → 차감했던 free/ticket 환불. 이미 확정/만료/취소된 예약이면 False.
+        """
+        if not rid:
+            return False
+        with _LOCK:
+            raw = self.R.get(f"resv:{rid}")
+            if not raw:
+                return False
+            self.R.delete(f"resv:{rid}")
+            resv = json.loads(raw)
+            if resv["kind"] in ("free", "ticket"):
+                k = self._k(resv["user_id"], resv["kind"])
+                self._set_int(k, self._get_int(k) + 1)
             return True
-        return False
 
     # ---- 지급 계열 (IAP/공유) ----
     def grant_ticket(self, user_id: str, amount: int = 1):
-        cur = self._get_int(self._k(user_id, "ticket"))
-        self._set_int(self._k(user_id, "ticket"), cur + max(0, amount))
+        with _LOCK:
+            cur = self._get_int(self._k(user_id, "ticket"))
+            self._set_int(self._k(user_id, "ticket"), cur + max(0, amount))
 
     def activate_pass(self, user_id: str, days: int = 7):
         now = dt.datetime.utcnow()
         until = now + dt.timedelta(days=days)
-        self.R.set(self._k(user_id, "pass_until"), until.isoformat())
+        with _LOCK:
+            self.R.set(self._k(user_id, "pass_until"), until.isoformat())
 
     def grant_share_daily(self, user_id: str, amount: int = 1, daily_limit: int = 2) -> bool:
         # 하루 합계가 daily_limit 넘으면 False
         today = _today_str()
         kcnt = f"sharecnt:{user_id}:{today}"
-        cur = self._get_int(kcnt)
-        if cur >= daily_limit:
-            return False
-        # 지급
-        self.grant_ticket(user_id, amount=amount)
-        self._set_int(kcnt, cur + 1)
-        return True
+        with _LOCK:
+            cur = self._get_int(kcnt)
+            if cur >= daily_limit:
+                return False
+            # 지급
+            self.grant_ticket(user_id, amount=amount)
+            self._set_int(kcnt, cur + 1)
+            return True
+
+    # ---- 대량 처리 (프로모션/마이그레이션) ----
+    def apply_bulk(self, ops: list[dict]) -> dict:
+        """
+        ops: [{"op_id", "user_id", "action", "amount"|"days"}, ...]
+        - 한 배치의 읽기/쓰기를 mget/mset 한 번씩으로 묶음(파이프라인)
+        - op_id 단위 멱등: 이미 처리된 op_id 는 건너뜀
+        - activate_pass 는 기존 패스가 더 길면 줄이지 않음
+        반환: {"applied", "duplicate", "invalid"}
+        """
+        # mget → 계산 → mset 사이에 예약 환불/지급이 끼어들면 유실되므로 배치 전체를 락 안에서
+        with _LOCK:
+            return self._apply_bulk(ops)
+
+    def _apply_bulk(self, ops: list[dict]) -> dict:
+        valid = [o for o in ops if o.get("op_id") and o.get("user_id") and o.get("action") in BULK_ACTIONS]
+        out = {"applied": 0, "duplicate": 0, "invalid": len(ops) - len(valid)}
+        if not valid:
+            return out
+
+        done_keys = [f"bulkop:{o['op_id']}" for o in valid]
+        val_keys = sorted({
+            self._k(o["user_id"], "ticket" if o["action"] == "grant_ticket" else "pass_until")
+            for o in valid
+        })
+        raw = self.R.mget(done_keys + val_keys)
+        done = dict(zip(done_keys, raw[: len(done_keys)]))
+        vals = dict(zip(val_keys, raw[len(done_keys):]))
+
+        now = dt.datetime.utcnow()
+        writes: dict[str, str] = {}
+        marks: dict[str, str] = {}
+        for o, dk in zip(valid, done_keys):
+            if done.get(dk) or dk in marks:
+                out["duplicate"] += 1
+                continue
+            if o["action"] == "grant_ticket":
+                k = self._k(o["user_id"], "ticket")
+                try:
+                    cur = int(writes.get(k) or vals.get(k) or 0)
+                except Exception:
+                    cur = 0
+                writes[k] = str(cur + max(0, int(o.get("amount", 1))))
+            else:
+                k = self._k(o["user_id"], "pass_until")
+                until = now + dt.timedelta(days=int(o.get("days", 7)))
+                prev = writes.get(k) or vals.get(k)
+                try:
+                    if prev and dt.datetime.fromisoformat(prev) > until:
+                        until = dt.datetime.fromisoformat(prev)
+                except Exception:
+                    pass
+                writes[k] = until.isoformat()
+            marks[dk] = "1"
+            out["applied"] += 1
+
+        if writes:
+            self.R.mset(writes)
+        if marks:
+            self.R.mset(marks, ttl_seconds=BULK_OP_TTL)
+        return out
@@ -0,0 +1,289 @@
+# services/model_router.py
+"""
+지연시간 기반 멀티 모델 라우터.
+
+후보 목록은 MODEL_ROUTES(JSON)로 주입. 없으면 OPENAI_MODEL 하나만 사용(기존 동작).
+  [
+    {"name": "main",  "model": "gpt-4o-mini", "weight": 1.0, "tiers": ["free","ticket","pass"], "cost": 1.0},
+    {"name": "fast",  "model": "gpt-4.1-nano", "weight": 0.5, "tiers": ["free"], "cost": 0.3},
+    {"name": "local", "model": "fake", "base_url": "http://127.0.0.1:8787/v1", "api_key": "local"}
+  ]
+- 라이브 호출로 후보별 EWMA 지연/에러율 추적 → 요청마다 가장 좋은 정상 후보 선택
+- 에러율이 높으면 일정 시간 후순위(서킷 오픈) → 쿨다운 후 요청 1건만 시험 호출(half-open)
+  성공하면 복귀, 실패하면 다시 쿨다운
+- 실패 시 다음 후보로 폴백
+- ROUTER_HEDGE=true 면 주 후보가 최근 지연 p{ROUTER_HEDGE_PCT} 를 넘길 때 다음 후보로 헤지 호출
+- base_url 로 OpenAI 호환 로컬 서버(services/fake_llm.py)를 붙여 오프라인 테스트 가능
+"""
+from __future__ import annotations
+
+import os
+import json
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Dict, List, Optional
+
+# ---- 설정 --------------------------------------------------------------------
+ROUTER_EWMA_ALPHA = float(os.getenv("ROUTER_EWMA_ALPHA", "0.2"))
+ROUTER_PRIOR_MS = float(os.getenv("ROUTER_PRIOR_MS", "1500"))       # 샘플 없는 후보의 가정 지연
+ROUTER_COST_WEIGHT = float(os.getenv("ROUTER_COST_WEIGHT", "0.2"))  # 비용이 점수에 미치는 비중
+ROUTER_ERR_THRESHOLD = float(os.getenv("ROUTER_ERR_THRESHOLD", "0.5"))
+ROUTER_COOLDOWN_SEC = float(os.getenv("ROUTER_COOLDOWN_SEC", "30"))
+ROUTER_EXPLORE = float(os.getenv("ROUTER_EXPLORE", "0.02"))         # 통계 갱신용 무작위 선택 확률
+ROUTER_HEDGE = os.getenv("ROUTER_HEDGE", "false").lower() == "true"
+ROUTER_HEDGE_PCT = float(os.getenv("ROUTER_HEDGE_PCT", "95"))
+ROUTER_HEDGE_MIN_SAMPLES = int(os.getenv("ROUTER_HEDGE_MIN_SAMPLES", "20"))
+ROUTER_TIMEOUT_SEC = float(os.getenv("ROUTER_TIMEOUT_SEC", "30"))
+
+TIERS = ("free", "ticket", "pass")
+
+
+class Candidate:
+    def __init__(self, name: str, model: str, base_url: Optional[str] = None, api_key: Optional[str] = None,
+                 api_key_env: Optional[str] = None, weight: float = 1.0, tiers: Optional[List[str]] = None,
+                 cost: float = 1.0):
+        self.name = name
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key or os.getenv(api_key_env or "OPENAI_API_KEY", "")
+        self.weight = max(0.01, float(weight))
+        self.tiers = set(tiers or TIERS)
+        self.cost = float(cost)
+        self._client = None
+
+        # 통계
+        self.lock = threading.Lock()
+        self.ewma_ms: Optional[float] = None
+        self.err_rate = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.recent: deque = deque(maxlen=200)
+        self.open_until = 0.0
+        self.probe_at = 0.0  # half-open 시험 호출을 넘겨준 시각 (0 = 없음)
+
+    @property
+    def usable(self) -> bool:
+        return bool(self.api_key)
+
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI  # type: ignore
+            self._client = OpenAI(api_key=self.api_key, base_url=self.base_url, timeout=ROUTER_TIMEOUT_SEC,
+                                  max_retries=0)
+        return self._client
+
+    # ---- 통계 갱신 ----
+    def record_usage(self, usage: Any):
+        if usage is None:
+            return
+        with self.lock:
+            self.prompt_tokens += int(getattr(usage, "prompt_tokens", 0) or 0)
+            self.completion_tokens += int(getattr(usage, "completion_tokens", 0) or 0)
+
+    def record(self, ms: float, ok: bool):
+        a = ROUTER_EWMA_ALPHA
+        with self.lock:
+            self.calls += 1
+            if ok:
+                self.ewma_ms = ms if self.ewma_ms is None else (1 - a) * self.ewma_ms + a * ms
+                self.recent.append(ms)
+            else:
+                self.errors += 1
+            self.err_rate = (1 - a) * self.err_rate + a * (0.0 if ok else 1.0)
+            now = time.monotonic()
+            if ok:
+                self.open_until = 0.0
+            elif self.open_until and now >= self.open_until:
+                # half-open 시험 호출 실패 → 다시 쿨다운
+                self.open_until = now + ROUTER_COOLDOWN_SEC
+            elif self.calls >= 5 and self.err_rate >= ROUTER_ERR_THRESHOLD:
+                self.open_until = now + ROUTER_COOLDOWN_SEC
+            self.probe_at = 0.0
+
+    def state(self) -> str:
+        if not self.open_until:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until else "half_open"
+
+    def healthy(self) -> bool:
+        return self.state() == "closed"
+
+    def admit(self) -> bool:
+        """
+        이번 요청에서 정상 후보로 취급할지. half-open 이면 시험 호출 1건만 True
+        (시험 호출이 ROUTER_TIMEOUT_SEC 안에 끝나지 않으면 다음 요청에 다시 넘김).
+        """
+        st = self.state()
+        if st != "half_open":
+            return st == "closed"
+        with self.lock:
+            now = time.monotonic()
+            if self.probe_at and now - self.probe_at < ROUTER_TIMEOUT_SEC:
+                return False
+            self.probe_at = now
+            return True
+
+    def score(self) -> float:
+        # 낮을수록 좋음
+        lat = self.ewma_ms if self.ewma_ms is not None else ROUTER_PRIOR_MS
+        return lat * (1 + ROUTER_COST_WEIGHT * self.cost) / self.weight / max(0.05, 1 - self.err_rate)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self.lock:
+            xs = sorted(self.recent)
+        if len(xs) < ROUTER_HEDGE_MIN_SAMPLES:
+            return None
+        idx = min(len(xs) - 1, int(len(xs) * pct / 100))
+        return xs[idx]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "model": self.model,
+            "base_url": self.base_url,
+            "weight": self.weight,
+            "tiers": sorted(self.tiers),
+            "cost": self.cost,
+            "ewma_ms": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "p95_ms": self.percentile(95),
+            "err_rate": round(self.err_rate, 3),
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "healthy": self.healthy(),
+            "circuit": self.state(),
+            "usable": self.usable,
+        }
+
+
+def _load_candidates() -> List[Candidate]:
+    raw = os.getenv("MODEL_ROUTES", "").strip()
+    if raw:
+        try:
+            return [Candidate(**c) for c in json.loads(raw)]
+        except Exception as e:
+            raise RuntimeError(f"MODEL_ROUTES 파싱 실패: {e}")
+    return [Candidate(name="default", model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"))]
+
+
+CANDIDATES: List[Candidate] = _load_candidates()
+_pool = ThreadPoolExecutor(max_workers=int(os.getenv("ROUTER_HEDGE_THREADS", "16")))
+
+
+# =============================================================================
+# 선택
+# =============================================================================
+def configured() -> bool:
+    """
+    호출 가능한 후보(키 또는 로컬 엔드포인트)가 하나라도 있는지.
+    """
+    return any(c.usable for c in CANDIDATES)
+
+
+def rank(tier: str = "free") -> List[Candidate]:
+    """
+    tier 에 허용된 후보를 점수순으로. 서킷이 열린 후보(및 시험 호출 중인 half-open 후보)는 뒤로.
+    """
+    elig = [c for c in CANDIDATES if c.usable and tier in c.tiers]
+    if not elig:
+        elig = [c for c in CANDIDATES if c.usable]
+    ok = {id(c): c.admit() for c in elig}
+    ranked = sorted(elig, key=lambda c: (not ok[id(c)], c.score()))
+    if len(ranked) > 1 and random.random() < ROUTER_EXPLORE:
+        pick = random.choice(ranked[1:])
+        ranked.remove(pick)
+        ranked.insert(0, pick)
+    return ranked
+
+
+# =============================================================================
+# 호출
+# =============================================================================
+def _call(c: Candidate, messages: List[Dict[str, str]], temperature: float, max_tokens: Optional[int]) -> str:
+    t0 = time.perf_counter()
+    try:
+        kw: Dict[str, Any] = {"model": c.model, "messages": messages, "temperature": temperature}
+        if max_tokens:
+            kw["max_tokens"] = max_tokens
+        resp = c.client().chat.completions.create(**kw)
+        text = resp.choices[0].message.content or ""
+    except Exception:
+        c.record((time.perf_counter() - t0) * 1000, ok=False)
+        raise
+    c.record((time.perf_counter() - t0) * 1000, ok=True)
+    c.record_usage(getattr(resp, "usage", None))
+    return text
+
+
+def _hedged(primary: Candidate, backup: Candidate, delay: Optional[float], messages, temperature, max_tokens) -> str:
+    # delay None(지연 기록 없음)이면 primary 만 호출
+    f1 = _pool.submit(_call, primary, messages, temperature, max_tokens)
+    if delay is None:
+        return f1.result()
+    done, _ = wait([f1], timeout=delay / 1000)
+    if done and f1.exception() is None:
+        return f1.result()
+    futs = [f1, _pool.submit(_call, backup, messages, temperature, max_tokens)]
+    last_exc: Optional[BaseException] = None
+    while futs:
+        done, _ = wait(futs, return_when=FIRST_COMPLETED)
+        for f in done:
+            futs.remove(f)
+            if f.exception() is None:
+                return f.result()
+            last_exc = f.exception()
+    raise last_exc  # type: ignore[misc]
+
+
+def chat(
+    messages: List[Dict[str, str]],
+    tier: str = "free",
+    temperature: float = 0.4,
+    max_tokens: Optional[int] = None,
+) -> str:
+    """
+    가장 좋은 후보로 호출, 실패하면 다음 후보로 폴백. 모두 실패하면 마지막 예외.
+    """
+    ranked = rank(tier)
+    if not ranked:
+        raise RuntimeError("사용 가능한 모델 후보 없음 (OPENAI_API_KEY / MODEL_ROUTES 확인)")
+
+    last_exc: Optional[Exception] = None
+    i = 0
+    while i < len(ranked):
+        c = ranked[i]
+        step = 1
+        try:
+            if ROUTER_HEDGE and i + 1 < len(ranked):
+                delay = c.percentile(ROUTER_HEDGE_PCT)
+                if delay is not None:
+                    step = 2  # 헤지로 백업까지 호출했으면 둘 다 건너뜀 (실패한 백업 재호출 방지)
+                return _hedged(c, ranked[i + 1], delay, messages, temperature, max_tokens)
+            return _call(c, messages, temperature, max_tokens)
+        except Exception as e:
+            last_exc = e
+        i += step
+    raise last_exc  # type: ignore[misc]
+
+
+def route_id() -> str:
+    """
+    후보 모델 구성 식별자 (캐시 키용). 구성이 바뀌면 값이 바뀜.
+    """
+    return ",".join(sorted(f"{c.name}={c.model}" for c in CANDIDATES))
+
+
+def usage_totals() -> Dict[str, int]:
+    p = sum(c.prompt_tokens for c in CANDIDATES)
+    o = sum(c.completion_tokens for c in CANDIDATES)
+    return {"prompt_tokens": p, "completion_tokens": o, "total_tokens": p + o}
+
+
+def snapshot() -> List[Dict[str, Any]]:
+    return [c.snapshot() for c in CANDIDATES]
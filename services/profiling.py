@@ -0,0 +1,232 @@
+# services/profiling.py
+"""
+요청 단위 온디맨드 프로파일링.
+
+트리거 (둘 중 하나):
+  - 서명 헤더  X-Gnom-Profile: <만료 epoch>.<hex HMAC-SHA256(PROFILE_SECRET, 만료 epoch)>
+    (토큰 발급: GET /admin/profiles/token)
+  - 샘플링     PROFILE_SAMPLE_RATE (0~1)
+
+- 표준 라이브러리 샘플링 프로파일러: 별도 스레드가 PROFILE_INTERVAL_MS 마다 스레드 스택 수집
+- 이 요청 것만 기록: 이벤트 루프 스레드는 이 요청의 코루틴 체인이 실행 중일 때만,
+  스레드풀 작업자는 이 요청 컨텍스트(contextvars)에서 넘긴 작업을 실행 중일 때만
+  (run_in_threadpool / asyncio.to_thread 모두 컨텍스트를 복사해 넘김)
+  → 동시에 처리 중인 다른 요청의 작업은 섞이지 않음. 요청이 만든 별도 태스크(create_task)는 제외.
+- 결과는 collapsed stack 포맷("a;b;c 12") — flamegraph.pl / speedscope 에 그대로 로드
+- PROFILE_DIR 에 최대 PROFILE_MAX_FILES 개만 유지(오래된 것부터 삭제)
+- 동시에 하나의 요청만 프로파일 (나머지는 그냥 통과)
+- 둘 다 설정 안 하면 미들웨어 자체를 붙이지 않음 → 오버헤드 0
+"""
+from __future__ import annotations
+
+import os
+import re
+import sys
+import hmac
+import time
+import random
+import asyncio
+import hashlib
+import threading
+import contextvars
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROFILE_SECRET = os.getenv("PROFILE_SECRET", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", Path(__file__).resolve().parent.parent / "data" / "profiles"))
+PROFILE_HEADER = b"x-gnom-profile"
+
+PROFILING_ENABLED = bool(PROFILE_SECRET) or PROFILE_SAMPLE_RATE > 0
+
+_ROOT = str(Path(__file__).resolve().parent.parent)
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py")  # 대기 중인 스레드 스택은 제외
+_NAME_RE = re.compile(r"^[0-9]+_[A-Z]+_[\w.-]*_[0-9]+ms\.collapsed$")
+_busy = threading.Lock()
+_REQ: contextvars.ContextVar = contextvars.ContextVar("gnom_profile_req", default=None)
+
+
+# =============================================================================
+# 서명 토큰
+# =============================================================================
+def _sign(expires: str) -> str:
+    return hmac.new(PROFILE_SECRET.encode(), expires.encode(), hashlib.sha256).hexdigest()
+
+
+def make_token(ttl_seconds: int = 300) -> str:
+    expires = str(int(time.time()) + ttl_seconds)
+    return f"{expires}.{_sign(expires)}"
+
+
+def verify_token(token: str) -> bool:
+    if not PROFILE_SECRET or "." not in token:
+        return False
+    expires, sig = token.split(".", 1)
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(sig, _sign(expires))
+
+
+# =============================================================================
+# 샘플러
+# =============================================================================
+def _label(frame) -> str:
+    co = frame.f_code
+    fn = co.co_filename
+    if fn.startswith(_ROOT):
+        fn = fn[len(_ROOT) + 1:]
+    else:
+        # site-packages 등은 패키지 경로 이후만
+        idx = fn.find("site-packages")
+        fn = fn[idx + 14:] if idx >= 0 else os.path.basename(fn)
+    return f"{co.co_name} ({fn})"
+
+
+def _worker_context(frame) -> Optional[contextvars.Context]:
+    """
+    스레드풀 작업자가 지금 실행 중인 작업의 Context.
+    anyio WorkerThread.run 의 지역변수 context / concurrent.futures _WorkItem.fn = partial(ctx.run, ...)
+    """
+    while frame is not None:
+        if frame.f_code.co_name == "run":
+            loc = frame.f_locals
+            ctx = loc.get("context")
+            if isinstance(ctx, contextvars.Context):
+                return ctx
+            fn = getattr(loc.get("self"), "fn", None)
+            ctx = getattr(getattr(fn, "func", None), "__self__", None)
+            if isinstance(ctx, contextvars.Context):
+                return ctx
+        frame = frame.f_back
+    return None
+
+
+class _Sampler(threading.Thread):
+    """
+    loop_tid/marker: 이벤트 루프 스레드 id 와 이 요청 미들웨어 프레임 (스택에 있으면 이 요청 실행 중)
+    token: 이 요청 컨텍스트의 _REQ 값 (작업자 스레드 판별)
+    """
+    def __init__(self, interval_sec: float, loop_tid: int, marker, token: object):
+        super().__init__(name="gnom-profiler", daemon=True)
+        self.interval = interval_sec
+        self.loop_tid = loop_tid
+        self.marker = marker
+        self.token = token
+        self.stop_evt = threading.Event()
+        self.counts: Counter = Counter()
+        self.samples = 0
+
+    def run(self):
+        me = threading.get_ident()
+        while not self.stop_evt.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == me or frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                if tid != self.loop_tid:
+                    ctx = _worker_context(frame)
+                    if ctx is None or ctx.get(_REQ) is not self.token:
+                        continue
+                stack: List[str] = []
+                mine = tid != self.loop_tid
+                f = frame
+                while f is not None:
+                    stack.append(_label(f))
+                    mine = mine or f is self.marker
+                    f = f.f_back
+                if mine:
+                    self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> Counter:
+        self.stop_evt.set()
+        self.join()
+        return self.counts
+
+
+# =============================================================================
+# 디스크 링
+# =============================================================================
+def _write_profile(method: str, path: str, dur_ms: int, counts: Counter) -> str:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^\w.-]+", "-", path.strip("/"))[:60] or "root"
+    name = f"{int(time.time() * 1000)}_{method}_{slug}_{dur_ms}ms.collapsed"
+    body = "\n".join(f"{stack} {n}" for stack, n in counts.most_common())
+    (PROFILE_DIR / name).write_text(body + "\n", encoding="utf-8")
+
+    files = sorted(PROFILE_DIR.glob("*.collapsed"))
+    for old in files[: max(0, len(files) - PROFILE_MAX_FILES)]:
+        old.unlink(missing_ok=True)
+    return name
+
+
+def list_profiles() -> List[Dict[str, object]]:
+    if not PROFILE_DIR.exists():
+        return []
+    out = []
+    for p in sorted(PROFILE_DIR.glob("*.collapsed"), reverse=True):
+        out.append({"name": p.name, "bytes": p.stat().st_size})
+    return out
+
+
+def read_profile(name: str) -> Optional[str]:
+    # 이름 형식 검증으로 경로 조작 차단
+    if not _NAME_RE.match(name):
+        return None
+    p = PROFILE_DIR / name
+    return p.read_text(encoding="utf-8") if p.exists() else None
+
+
+# =============================================================================
+# ASGI 미들웨어
+# =============================================================================
+class ProfilingMiddleware:
+    """
+    순수 ASGI 미들웨어 (BaseHTTPMiddleware 보다 가벼움).
+    미선택 요청은 헤더 1회 조회 + 난수 1회 비교만 하고 그대로 통과.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def _wanted(self, scope) -> bool:
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            return True
+        if PROFILE_SECRET:
+            for k, v in scope.get("headers", ()):
+                if k == PROFILE_HEADER:
+                    return verify_token(v.decode("latin-1"))
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope) or not _busy.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        token = object()
+        req_tok = _REQ.set(token)  # 이 요청 태스크 컨텍스트 — 스레드풀로 넘어가는 작업에 복사됨
+        sampler = _Sampler(PROFILE_INTERVAL_MS / 1000, threading.get_ident(), sys._getframe(), token)
+        t0 = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            dur_ms = int((time.perf_counter() - t0) * 1000)
+            _REQ.reset(req_tok)
+            sampler.stop_evt.set()
+            # join + 파일 쓰기/정리는 이벤트 루프 밖에서 (기다리지 않음 — 응답 지연/취소와 무관)
+            asyncio.get_running_loop().run_in_executor(
+                None, _finish, sampler, scope.get("method", "GET"), scope.get("path", ""), dur_ms
+            )
+
+
+def _finish(sampler: _Sampler, method: str, path: str, dur_ms: int):
+    try:
+        counts = sampler.stop()
+    finally:
+        _busy.release()
+    if counts:
+        try:
+            _write_profile(method, path, dur_ms, counts)
+        except OSError:
+            pass
@@ -0,0 +1,335 @@
+# services/reanalyze.py
+"""
+오프라인 일괄 재분석 CLI — 프롬프트(prompts/, _build_prompt)나 OPENAI_MODEL/MODEL_ROUTES 변경 전
+품질 비교 + 분석 캐시 예열용.
+
+입력 JSONL 한 줄: {"message": "...", "relationship": "...", "lang": "ko"}
+출력 JSONL 한 줄: {"line", "message", "relationship", "lang", "cache_key", "result" | "error", "ms"}
+
+  OPENAI_MODEL=gpt-4o python -m services.reanalyze corpus.jsonl -o out.jsonl --concurrency 8
+  python -m services.reanalyze logs.jsonl -o top.jsonl --top 500            # 가장 자주 나온 메시지만
+  python -m services.reanalyze corpus.jsonl -o out.jsonl --push-url https://api.example.com --token $ADMIN_TOKEN
+  python -m services.reanalyze corpus.jsonl -o out.jsonl --kind analyze --push-url ...   # /analyze 캐시 예열
+
+- 동시성은 AIMD: 429(레이트리밋)면 절반으로, 성공이 이어지면 1씩 회복 (--concurrency 가 상한)
+- 429 응답의 Retry-After 를 존중, 그 외 일시 오류는 지수 백오프
+- 출력 파일이 곧 체크포인트: 다시 실행하면 이미 결과가 있는 줄은 건너뜀
+  — 실패("error")했던 줄은 다시 실행되어 뒤에 추가되므로 같은 line 레코드가 여러 번 나올 수 있음.
+    출력을 읽을 때는 line 별 마지막 레코드를 사용
+- 객체가 아닌 줄/깨진 JSON/빈 message 는 건너뛰고 invalid 로 집계
+- --kind: 어느 경로의 캐시 키로 분석할지
+    emotion = analyze_emotion (리포트 워커 등 서비스 내부 호출)
+    analyze = POST /analyze (사용자 요청 경로 — 시스템 프롬프트/파서가 달라 키도 다름)
+- --push-url: 성공 결과를 서버 분석 캐시로 업로드 (POST /admin/analysis-cache/import)
+  — 캐시 키에 프롬프트 전문과 모델 구성이 들어가므로 '새 프롬프트 버전' 키로 채워짐
+  — 업로드는 재시도 후에도 실패하면 push_failed 로 집계하고 종료 코드 1
+- 종료 시 처리량과 토큰 사용량 출력
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from services import analyze_service as A
+from services import model_router
+from services import analysis_cache
+
+
+# =============================================================================
+# 입력
+# =============================================================================
+def _iter_input(path: str) -> Iterator[Tuple[int, Optional[Dict[str, str]]]]:
+    # (줄번호, 행) — 쓸 수 없는 행은 (줄번호, None)
+    with open(path, "r", encoding="utf-8") as f:
+        n = 0
+        for raw in f:
+            raw = raw.strip()
+            if not raw:
+                continue
+            n += 1
+            try:
+                row = json.loads(raw)
+            except json.JSONDecodeError:
+                row = None
+            msg = str(row.get("message") or "").strip() if isinstance(row, dict) else ""
+            if not msg:
+                yield n, None
+            else:
+                yield n, {
+                    "message": msg,
+                    "relationship": str(row.get("relationship") or ""),
+                    "lang": str(row.get("lang") or "ko"),
+                }
+
+
+def _top_input(path: str, top: int) -> Iterator[Tuple[int, Dict[str, str]]]:
+    # 같은 (message, relationship, lang) 빈도순 상위 N개. 줄번호는 순위.
+    cnt: Counter = Counter()
+    for _, row in _iter_input(path):
+        if row is None:
+            continue
+        cnt[(row["message"], row["relationship"], row["lang"])] += 1
+    for rank, ((m, r, l), _) in enumerate(cnt.most_common(top), start=1):
+        yield rank, {"message": m, "relationship": r, "lang": l}
+
+
+def _done_lines(out_path: str) -> Set[int]:
+    done: Set[int] = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, "r", encoding="utf-8") as f:
+        for raw in f:
+            try:
+                rec = json.loads(raw)
+            except json.JSONDecodeError:
+                continue  # 중단 시 잘린 마지막 줄
+            if "result" in rec:
+                done.add(int(rec["line"]))
+    return done
+
+
+# =============================================================================
+# 레이트리밋 인식
+# =============================================================================
+def _rate_limit_wait(e: Exception) -> Optional[float]:
+    """
+    429 면 대기 초(Retry-After 또는 기본값), 아니면 None.
+    """
+    status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    if status != 429 and type(e).__name__ != "RateLimitError":
+        return None
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return max(0.5, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return 5.0
+
+
+class _AIMDLimiter:
+    """
+    동시 실행 상한을 레이트리밋에 맞춰 조절 (가산 증가 / 승산 감소).
+    """
+    def __init__(self, max_limit: int):
+        self.max = max(1, max_limit)
+        self.limit = float(self.max)
+        self.inflight = 0
+        self.cond = asyncio.Condition()
+        self.pause_until = 0.0
+
+    async def acquire(self):
+        async with self.cond:
+            while self.inflight >= int(self.limit):
+                await self.cond.wait()
+            self.inflight += 1
+        delay = self.pause_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self, ok: bool, throttled_for: Optional[float] = None):
+        async with self.cond:
+            self.inflight -= 1
+            if throttled_for is not None:
+                self.limit = max(1.0, self.limit / 2)
+                self.pause_until = max(self.pause_until, time.monotonic() + throttled_for)
+            elif ok:
+                self.limit = min(float(self.max), self.limit + 1 / max(1.0, self.limit))
+            self.cond.notify_all()
+
+
+# =============================================================================
+# 실행
+# =============================================================================
+async def _run(args) -> Dict[str, Any]:
+    done = set() if args.restart else _done_lines(args.output)
+    rows = _top_input(args.input, args.top) if args.top else _iter_input(args.input)
+    limiter = _AIMDLimiter(args.concurrency)
+    out = open(args.output, "w" if args.restart else "a", encoding="utf-8")
+    stats = Counter()
+    push_buf: List[Dict[str, Any]] = []
+    t0 = time.perf_counter()
+    usage0 = model_router.usage_totals()
+
+    async def _one(line: int, row: Dict[str, str]):
+        ckey, fn = _target(args.kind, row)
+        rec: Dict[str, Any] = {"line": line, **row, "cache_key": ckey}
+        attempt = throttles = 0
+        while True:
+            await limiter.acquire()
+            t = time.perf_counter()
+            try:
+                rec["result"] = await asyncio.to_thread(fn, args.tier)
+                rec["ms"] = int((time.perf_counter() - t) * 1000)
+                rec.pop("error", None)
+                await limiter.release(ok=True)
+                break
+            except Exception as e:
+                wait = _rate_limit_wait(e)
+                await limiter.release(ok=False, throttled_for=wait)
+                rec["error"] = f"{type(e).__name__}: {e}"
+                if wait is not None:
+                    # 레이트리밋은 재시도 횟수에 안 셈 (limiter 가 대기/감속 처리)
+                    stats["throttled"] += 1
+                    throttles += 1
+                    if throttles > args.max_throttles:
+                        break
+                    continue
+                if attempt >= args.retries:
+                    break
+                await asyncio.sleep(min(30.0, 2 ** attempt))
+                attempt += 1
+        stats["ok" if "result" in rec else "failed"] += 1
+        out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        out.flush()
+        if "result" in rec and args.push_url:
+            push_buf.append({"cache_key": ckey, "result": rec["result"]})
+            if len(push_buf) >= args.push_batch:
+                batch = push_buf[:]
+                push_buf.clear()
+                await _push_batch(batch)
+        n = stats["ok"] + stats["failed"]
+        if n % args.progress_every == 0:
+            el = time.perf_counter() - t0
+            print(f"[reanalyze] {n} done  ok={stats['ok']} failed={stats['failed']} "
+                  f"throttled={stats['throttled']}  {n / el:.2f}/s  limit={int(limiter.limit)}", file=sys.stderr)
+
+    async def _push_batch(batch: List[Dict[str, Any]]):
+        try:
+            res = await asyncio.to_thread(_push, args, batch)
+        except Exception as e:
+            stats["push_failed"] += len(batch)
+            print(f"[reanalyze] push failed ({len(batch)} items): {type(e).__name__}: {e}", file=sys.stderr)
+            return
+        stats["pushed"] += int(res.get("imported", 0))
+        stats["push_failed"] += int(res.get("invalid", 0))
+
+    def _reap(finished: Set[asyncio.Task]):
+        # asyncio.wait 는 작업 예외를 다시 올리지 않음 → 직접 꺼내서 중단
+        for t in finished:
+            if t.exception() is not None:
+                raise t.exception()
+
+    pending: Set[asyncio.Task] = set()
+    try:
+        for line, row in rows:
+            if row is None:
+                stats["invalid"] += 1
+                continue
+            if line in done:
+                stats["skipped"] += 1
+                continue
+            # 입력을 전부 메모리에 올리지 않도록 대기 작업 수를 제한
+            while len(pending) >= args.concurrency * 4:
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                _reap(finished)
+            pending.add(asyncio.create_task(_one(line, row)))
+        if pending:
+            finished, pending = await asyncio.wait(pending)
+            _reap(finished)
+        if push_buf:
+            await _push_batch(push_buf)
+    finally:
+        for t in pending:
+            t.cancel()
+        out.close()
+
+    el = time.perf_counter() - t0
+    usage1 = model_router.usage_totals()
+    tokens = {k: usage1[k] - usage0[k] for k in usage1}
+    n = stats["ok"] + stats["failed"]
+    return {
+        "ok": stats["ok"],
+        "failed": stats["failed"],
+        "skipped": stats["skipped"],
+        "invalid": stats["invalid"],
+        "throttled": stats["throttled"],
+        "pushed": stats["pushed"],
+        "push_failed": stats["push_failed"],
+        "elapsed_sec": round(el, 2),
+        "per_sec": round(n / el, 3) if el > 0 else None,
+        "tokens": tokens,
+        "tokens_per_sec": round(tokens["total_tokens"] / el, 1) if el > 0 else None,
+        "route": model_router.route_id(),
+    }
+
+
+def _target(kind: str, row: Dict[str, str]):
+    """
+    (캐시 키, tier → 결과 dict 함수). 키는 서버가 실제로 조회하는 것과 같아야 예열 효과가 있음.
+    """
+    if kind == "analyze":
+        from routers.analyze import AnalyzeBody, _prompts, _parse_to_struct
+
+        system_prompt, content = _prompts(AnalyzeBody(message=row["message"], lang=row["lang"]))
+
+        def _call(tier: str) -> Dict[str, Any]:
+            # /analyze 와 같은 호출/파서. 레이트리밋 예외는 감싸지 않고 그대로 올림
+            txt = model_router.chat(
+                [{"role": "system", "content": system_prompt}, {"role": "user", "content": content}],
+                tier=tier,
+                temperature=0.3,
+            )
+            return _parse_to_struct(txt).model_dump()
+
+        return analysis_cache.cache_key("analyze", system_prompt, content), _call
+
+    def _emotion(tier: str) -> Dict[str, Any]:
+        return A.analyze_emotion_strict(row["message"], row["relationship"], tier)
+
+    return A.emotion_cache_key(row["message"], row["relationship"]), _emotion
+
+
+def _push(args, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    import requests
+
+    body = "\n".join(json.dumps(it, ensure_ascii=False) for it in items).encode("utf-8")
+    url = args.push_url.rstrip("/") + "/admin/analysis-cache/import"
+    # 연결 오류/타임아웃/5xx 만 재시도. 4xx(잘못된 토큰, 형식 오류)는 재시도해도 같으므로 즉시 실패
+    for attempt in range(args.retries + 1):
+        try:
+            r = requests.post(url, data=body, headers={"X-Admin-Token": args.token,
+                                                       "Content-Type": "application/x-ndjson"}, timeout=60)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= args.retries:
+                raise
+        else:
+            if r.status_code < 500 or attempt >= args.retries:
+                r.raise_for_status()
+                return r.json()
+        time.sleep(min(30.0, 2 ** attempt))
+    return {}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Gnom 일괄 재분석 / 캐시 예열")
+    ap.add_argument("input", help="JSONL: message, relationship, lang")
+    ap.add_argument("-o", "--output", required=True, help="결과 JSONL (체크포인트 겸용)")
+    ap.add_argument("--concurrency", type=int, default=8, help="동시 모델 호출 상한")
+    ap.add_argument("--retries", type=int, default=3, help="레이트리밋 외 오류 재시도 횟수")
+    ap.add_argument("--max-throttles", type=int, default=20, help="한 줄당 429 허용 횟수")
+    ap.add_argument("--tier", default="free", help="모델 라우터 티어")
+    ap.add_argument("--kind", choices=("emotion", "analyze"), default="emotion",
+                    help="예열할 캐시 키 종류 (emotion=analyze_emotion, analyze=POST /analyze)")
+    ap.add_argument("--top", type=int, default=0, help="빈도 상위 N개 메시지만")
+    ap.add_argument("--restart", action="store_true", help="기존 출력 무시하고 처음부터")
+    ap.add_argument("--push-url", default=None, help="서버 분석 캐시로 업로드할 API 주소")
+    ap.add_argument("--token", default=os.getenv("ADMIN_TOKEN", ""))
+    ap.add_argument("--push-batch", type=int, default=200)
+    ap.add_argument("--progress-every", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    if not A.model_ready():
+        print("모델 설정 없음 (OPENAI_API_KEY / MODEL_ROUTES)", file=sys.stderr)
+        return 2
+    summary = asyncio.run(_run(args))
+    print(json.dumps(summary, ensure_ascii=False))
+    return 0 if summary["failed"] == 0 and summary["push_failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
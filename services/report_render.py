@@ -0,0 +1,72 @@
+# services/report_render.py
+"""
+프리미엄 감정 리포트 PDF 렌더러.
+- ProcessPoolExecutor 에서 실행되므로 모듈 최상위 함수 + 피클 가능한 인자만 사용.
+- PyMuPDF(fitz) 필요. 미설치 환경에서는 RuntimeError.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+PAGE_W, PAGE_H = 595, 842  # A4 (pt)
+MARGIN = 48
+FONT = "korea"  # PyMuPDF 내장 CJK 폰트
+
+
+def _lines(report: Dict[str, Any]) -> List[tuple]:
+    """
+    (텍스트, 폰트 크기) 목록으로 평탄화.
+    """
+    out: List[tuple] = [
+        ("Gnom AI 감정 리포트", 20),
+        (f"기간: {report.get('period', '')}  ·  관계: {report.get('relationship', '') or '-'}", 10),
+        ("", 8),
+        ("[전체 흐름]", 14),
+        (report.get("overview", ""), 11),
+        ("", 8),
+        ("[주요 감정]", 14),
+        (", ".join(f"{t} ×{n}" for t, n in report.get("top_tags", [])) or "-", 11),
+        (" ".join(report.get("top_emojis", [])), 11),
+        ("", 8),
+        ("[메시지별 해석]", 14),
+    ]
+    for i, item in enumerate(report.get("items", []), start=1):
+        out.append((f"{i}. {item.get('message', '')[:80]}", 10))
+        out.append((item.get("interpretation", ""), 10))
+        out.append((f"→ {item.get('insight', '')}", 10))
+        out.append(("", 6))
+    return out
+
+
+def render_report_pdf(report: Dict[str, Any], path: str) -> str:
+    """
+    report(dict) → PDF 파일(path). 페이지가 넘치면 자동으로 새 페이지.
+    """
+    try:
+        import fitz  # type: ignore  # PyMuPDF
+    except Exception as e:
+        raise RuntimeError(f"PDF 렌더러 로딩 불가: {e}")
+
+    doc = fitz.open()
+    page = doc.new_page(width=PAGE_W, height=PAGE_H)
+    y = MARGIN
+    width = PAGE_W - MARGIN * 2
+
+    for text, size in _lines(report):
+        if not text:
+            y += size
+            continue
+        # 대략적인 줄 수 추정(한글 폭 ≈ 글자 크기)으로 박스 높이 계산
+        per_line = max(1, int(width // size))
+        rows = sum(max(1, -(-len(part) // per_line)) for part in text.split("\n"))
+        h = rows * size * 1.5 + 4
+        if y + h > PAGE_H - MARGIN:
+            page = doc.new_page(width=PAGE_W, height=PAGE_H)
+            y = MARGIN
+        rect = fitz.Rect(MARGIN, y, MARGIN + width, y + h)
+        page.insert_textbox(rect, text, fontsize=size, fontname=FONT)
+        y += h
+
+    doc.save(path)
+    doc.close()
+    return path
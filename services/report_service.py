@@ -0,0 +1,252 @@
+# services/report_service.py
+"""
+프리미엄 감정 리포트 비동기 작업 큐.
+
+흐름:
+  enqueue_report() → 스토어 큐(report:queue)에 job_id 적재 → 202 + job_id
+  워커(asyncio task N개) → 모델 호출 동시 실행 → PDF 는 프로세스 풀에서 렌더
+  get_job() / wait_job() → 폴링 / 롱폴링
+
+- (user, target, period) 당 진행 중 작업은 1개로 중복 제거 (완료 작업은 입력 내용이 같을 때만 재사용)
+- 결과는 입력 내용 해시(report:cache:{hash})로 캐시 → 같은 입력이면 모델 재호출 없음
+- 큐/상태 모두 dependencies.get_store() 위에 있어서 외부 브로커 없이 로컬 실행 가능
+"""
+from __future__ import annotations
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from dependencies import get_store
+from services import analyze_service as A
+from services import model_router
+from services.report_render import render_report_pdf
+
+# ---- 설정 --------------------------------------------------------------------
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))             # 동시에 처리할 작업 수
+REPORT_MODEL_CONCURRENCY = int(os.getenv("REPORT_MODEL_CONCURRENCY", "4"))  # 작업당 동시 모델 호출
+REPORT_RENDER_PROCS = int(os.getenv("REPORT_RENDER_PROCS", "2"))
+REPORT_MAX_MESSAGES = int(os.getenv("REPORT_MAX_MESSAGES", "20"))
+REPORT_JOB_TTL = int(os.getenv("REPORT_JOB_TTL", str(7 * 24 * 3600)))
+REPORTS_DIR = Path(os.getenv("REPORTS_DIR", Path(__file__).resolve().parent.parent / "data" / "reports"))
+
+QUEUE_KEY = "report:queue"
+
+R = get_store()
+
+_workers: List[asyncio.Task] = []
+_wakeup: Optional[asyncio.Event] = None
+_proc_pool: Optional[ProcessPoolExecutor] = None
+
+
+# =============================================================================
+# 키 & 해시
+# =============================================================================
+def _job_key(job_id: str) -> str:
+    return f"report:job:{job_id}"
+
+
+def _dedup_key(user_id: str, target_id: str, period: str) -> str:
+    return f"report:dedup:{user_id}:{target_id}:{period}"
+
+
+def _cache_key(content_hash: str) -> str:
+    return f"report:cache:{content_hash}"
+
+
+def content_hash(messages: List[str], relationship: str, period: str) -> str:
+    """
+    리포트 입력 내용 해시. 모델 구성(MODEL_ROUTES)이 바뀌면 결과도 달라지므로 route_id 포함.
+    """
+    raw = json.dumps(
+        {"m": messages, "r": relationship, "p": period, "model": model_router.route_id()},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# 작업 조회/적재
+# =============================================================================
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    return R.get_json(_job_key(job_id))
+
+
+def _save_job(job: Dict[str, Any]):
+    R.set_json(_job_key(job["id"]), job, REPORT_JOB_TTL)
+
+
+def enqueue_report(
+    user_id: str,
+    target_id: str,
+    period: str,
+    messages: List[str],
+    relationship: str = "",
+) -> Dict[str, Any]:
+    """
+    작업 생성 + 큐 적재. 같은 (user, target, period) 작업이 대기/진행 중이거나,
+    완료됐고 입력 내용 해시가 같으면 그 작업을 반환.
+    """
+    msgs = [m.strip() for m in messages if isinstance(m, str) and m.strip()][-REPORT_MAX_MESSAGES:]
+    h = content_hash(msgs, relationship, period)
+
+    existing_id = R.get(_dedup_key(user_id, target_id, period))
+    if existing_id:
+        job = get_job(existing_id)
+        if job and (job["status"] in ("queued", "running") or (job["status"] == "done" and job["hash"] == h)):
+            return job
+    job = {
+        "id": uuid.uuid4().hex,
+        "status": "queued",
+        "user_id": user_id,
+        "target_id": target_id,
+        "period": period,
+        "relationship": relationship,
+        "messages": msgs,
+        "hash": h,
+        "created_at": int(time.time()),
+        "finished_at": None,
+        "result": None,
+        "pdf_path": None,
+        "error": None,
+    }
+
+    # 같은 내용으로 이미 만든 리포트가 있으면 바로 완료 처리
+    cached = R.get_json(_cache_key(h))
+    if cached and Path(cached.get("pdf_path") or "").exists():
+        job.update(status="done", result=cached["result"], pdf_path=cached["pdf_path"],
+                   finished_at=int(time.time()))
+        _save_job(job)
+    else:
+        _save_job(job)
+        R.rpush(QUEUE_KEY, job["id"])
+        if _wakeup is not None:
+            _wakeup.set()
+
+    R.set(_dedup_key(user_id, target_id, period), job["id"], REPORT_JOB_TTL)
+    return job
+
+
+async def wait_job(job_id: str, timeout: float = 0.0, interval: float = 0.25) -> Optional[Dict[str, Any]]:
+    """
+    롱폴링: done/failed 가 되거나 timeout 이 지날 때까지 대기. timeout=0 이면 즉시 반환.
+    """
+    deadline = time.monotonic() + max(0.0, timeout)
+    while True:
+        job = get_job(job_id)
+        if job is None or job["status"] in ("done", "failed") or time.monotonic() >= deadline:
+            return job
+        await asyncio.sleep(interval)
+
+
+# =============================================================================
+# 작업 처리
+# =============================================================================
+def _build_report(job: Dict[str, Any], items: List[Dict[str, Any]], overview: str) -> Dict[str, Any]:
+    tags = Counter(t for it in items for t in it.get("tags", []))
+    emojis = Counter(e for it in items for e in it.get("emojis", []))
+    return {
+        "period": job["period"],
+        "relationship": job["relationship"],
+        "overview": overview,
+        "top_tags": tags.most_common(5),
+        "top_emojis": [e for e, _ in emojis.most_common(5)],
+        "items": items,
+    }
+
+
+async def _run_job(job: Dict[str, Any]):
+    sem = asyncio.Semaphore(REPORT_MODEL_CONCURRENCY)
+    rel = job["relationship"] or ""
+
+    async def _one(msg: str) -> Dict[str, Any]:
+        # 동기 SDK 호출 → 스레드로 넘겨 이벤트 루프를 막지 않음.
+        # 오류를 폴백 문구로 감추는 analyze_emotion 대신 예외를 올려 작업을 failed 로 남김
+        async with sem:
+            res = await asyncio.to_thread(A.analyze_emotion_cached, msg, rel)
+        return {"message": msg, **res}
+
+    async def _overview() -> str:
+        if not A.model_ready() or not job["messages"]:
+            return A._dummy_result()["interpretation"]
+        joined = "\n".join(f"- {m}" for m in job["messages"])
+        prompt = (
+            f"다음은 '{rel}' 관계의 상대가 기간({job['period']}) 동안 보낸 메시지입니다.\n"
+            f"{joined}\n\n"
+            "감정 흐름과 변화를 5~8문장 한국어로, 과장/단정 없이 요약하세요. 일반 텍스트로만 답하세요."
+        )
+        async with sem:
+            text = (await asyncio.to_thread(A._chat_text, prompt, 900)).strip()
+        if not text:
+            raise ValueError("empty overview")
+        return text
+
+    overview, *items = await asyncio.gather(_overview(), *(_one(m) for m in job["messages"]))
+    report = _build_report(job, list(items), overview)
+
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = str(REPORTS_DIR / f"{job['hash']}.pdf")
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_proc_pool, render_report_pdf, report, path)
+
+    # 모든 항목이 실제 모델 결과일 때만 내용 해시 캐시에 기록 (키 미설정 예시 응답은 캐시 안 함)
+    if A.model_ready():
+        R.set_json(_cache_key(job["hash"]), {"result": report, "pdf_path": path}, REPORT_JOB_TTL)
+    job.update(status="done", result=report, pdf_path=path, finished_at=int(time.time()))
+
+
+async def _worker(n: int):
+    while True:
+        job_id = R.lpop(QUEUE_KEY)
+        if job_id is None:
+            _wakeup.clear()
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        job = get_job(job_id)
+        if not job or job["status"] != "queued":
+            continue
+        job["status"] = "running"
+        _save_job(job)
+        try:
+            await _run_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.update(status="failed", error=f"{type(e).__name__}: {e}", finished_at=int(time.time()))
+        _save_job(job)
+
+
+# =============================================================================
+# 라이프사이클 (main.py startup/shutdown 에서 호출)
+# =============================================================================
+async def start_workers():
+    global _wakeup, _proc_pool
+    if _workers:
+        return
+    _wakeup = asyncio.Event()
+    _proc_pool = ProcessPoolExecutor(max_workers=REPORT_RENDER_PROCS)
+    for i in range(REPORT_WORKERS):
+        _workers.append(asyncio.create_task(_worker(i)))
+
+
+async def stop_workers():
+    global _proc_pool
+    for t in _workers:
+        t.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    if _proc_pool is not None:
+        _proc_pool.shutdown(wait=False, cancel_futures=True)
+        _proc_pool = None
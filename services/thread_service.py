@@ -0,0 +1,237 @@
+# services/thread_service.py
+from __future__ import annotations
+
+import os
+import json
+import hashlib
+from typing import Any, Dict, List, Tuple
+
+from dependencies import get_store
+from services import analyze_service as A
+
+# ---- 설정 --------------------------------------------------------------------
+# 요약은 매 호출마다 모델에 다시 들어가므로 길이를 고정 상한으로 묶어둔다.
+# → 스레드가 길어져도 입력 크기는 (요약 + 새 메시지)로 거의 일정.
+THREAD_SUMMARY_MAX_CHARS = int(os.getenv("THREAD_SUMMARY_MAX_CHARS", "600"))
+THREAD_MAX_DELTA = int(os.getenv("THREAD_MAX_DELTA", "8"))        # 한 번에 보낼 새 메시지 최대 개수
+THREAD_MSG_MAX_CHARS = int(os.getenv("THREAD_MSG_MAX_CHARS", "1000"))
+
+R = get_store()
+
+
+# =============================================================================
+# 키 & 상태
+# =============================================================================
+def _msg_hash(message: str) -> str:
+    return hashlib.sha256(message.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def _state_key(user_id: str, target_id: str) -> str:
+    return f"thread:{user_id}:{target_id}"
+
+
+def _result_key(user_id: str, target_id: str, seq: int) -> str:
+    # 전체 결과(interpretation/insight/tags/emojis) — 응답으로 그대로 재사용 가능
+    return f"thread:{user_id}:{target_id}:msg:{seq}"
+
+
+def _note_key(user_id: str, target_id: str, seq: int) -> str:
+    # 맥락 메시지의 per_message 한 문장 해석({interpretation, tags}) — 응답 재사용 안 함
+    return f"thread:{user_id}:{target_id}:note:{seq}"
+
+
+def _load_state(user_id: str, target_id: str) -> Dict[str, Any]:
+    # count: 스레드 앞에서부터 처리 완료한 메시지 수, tail: 마지막 처리 메시지(seq = count-1) 해시
+    st = R.get_json(_state_key(user_id, target_id)) or {}
+    return {
+        "summary": str(st.get("summary", "")),
+        "count": int(st.get("count", 0) or 0),
+        "tail": st.get("tail"),
+    }
+
+
+def _save_state(user_id: str, target_id: str, st: Dict[str, Any]):
+    R.set_json(_state_key(user_id, target_id), st)
+
+
+def get_thread_summary(user_id: str, target_id: str) -> str:
+    return _load_state(user_id, target_id)["summary"]
+
+
+def reset_thread(user_id: str, target_id: str):
+    R.set_json(_state_key(user_id, target_id), {"summary": "", "count": 0, "tail": None})
+
+
+# =============================================================================
+# 프롬프트 & 파서
+# =============================================================================
+def _build_thread_prompt(summary: str, delta: List[str], relationship: str) -> str:
+    """
+    이전 대화 전체 대신 '누적 요약 + 새 메시지(delta)'만 보낸다.
+    마지막 메시지를 해석 대상으로, 나머지 delta는 맥락으로 사용.
+    """
+    prev = summary or "(없음 — 첫 분석)"
+    lines = "\n".join(f"- {m[:THREAD_MSG_MAX_CHARS]}" for m in delta[:-1]) or "(없음)"
+    target = delta[-1][:THREAD_MSG_MAX_CHARS]
+    return f"""
+당신은 '관계 기반 감정 해석' 전문 AI입니다.
+같은 상대와의 대화 흐름을 이어서 해석합니다. 과도한 추측 없이 해석하세요.
+출력은 반드시 JSON 스키마로만 응답합니다(설명, 주석, 추가 문장 금지).
+
+[관계]
+{relationship}
+
+[지금까지의 대화 요약]
+{prev}
+
+[새로 추가된 메시지(맥락)]
+{lines}
+
+[해석할 최신 메시지]
+{target}
+
+[지침]
+- 해석 문장은 3~5문장, 한국어, 과장/단정 금지. 이전 흐름과의 변화에 주목.
+- 한 줄 통찰은 함축적으로, "핵심 신호"를 요약.
+- tags: 감정/상태를 1~3개.
+- emojis: 메시지 정서와 맞는 이모지 3개.
+- per_message: 새로 추가된 메시지(맥락) 각각에 대해 순서대로 한 문장 해석과 tags 1~2개.
+- summary: 이전 요약과 새 메시지를 합쳐 관계의 감정 흐름을 {THREAD_SUMMARY_MAX_CHARS}자 이내로 다시 압축.
+- 절대 개인정보, 의료/법률/투자 조언 금지.
+- 반드시 아래 JSON 스키마만 출력:
+
+{{"interpretation": "...", "insight": "...", "tags": ["..."], "emojis": ["...","...","..."],
+  "per_message": [{{"interpretation": "...", "tags": ["..."]}}], "summary": "..."}}
+""".strip()
+
+
+def _extract_extra(text: str) -> Tuple[str, List[Dict[str, Any]]]:
+    # (summary, per_message) — 없거나 형식이 틀리면 빈 값
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end == -1 or end <= start:
+        return "", []
+    try:
+        data = json.loads(text[start : end + 1])
+    except Exception:
+        return "", []
+    per = data.get("per_message")
+    items = []
+    for it in per if isinstance(per, list) else []:
+        if isinstance(it, dict) and str(it.get("interpretation", "")).strip():
+            tags = it.get("tags")
+            items.append({
+                "interpretation": str(it["interpretation"]).strip(),
+                "tags": [str(t) for t in tags] if isinstance(tags, list) else [],
+            })
+    return str(data.get("summary", "")).strip(), items
+
+
+def _split_delta(st: Dict[str, Any], msgs: List[str], start_seq: int) -> Tuple[int, List[str]]:
+    """
+    위치(seq) 기준으로 새 메시지 구간을 찾는다. msgs[i] 의 seq = start_seq + i.
+    반환: (delta 첫 메시지 seq, delta)
+    - 마지막 처리 메시지(seq = count-1)가 이번 요청 범위 안에 있는데 해시가 다르면
+      스레드가 바뀐 것(삭제/재설치 등) → 상태를 버리고 보낸 메시지 전체를 새로 처리
+    - 같은 내용의 메시지("ㅋㅋ", "ㅇㅇ")가 반복돼도 위치로 구분되므로 누락 없음
+    """
+    count, tail = st["count"], st["tail"]
+    i_tail = count - 1 - start_seq
+    if count and 0 <= i_tail < len(msgs) and _msg_hash(msgs[i_tail]) != tail:
+        st.update({"summary": "", "count": 0, "tail": None})
+        return start_seq, msgs
+    if start_seq > count:
+        # 중간 메시지를 못 받음 — 받은 범위만 처리
+        return start_seq, msgs
+    i0 = count - start_seq
+    return count, msgs[i0:]
+
+
+# =============================================================================
+# 퍼블릭 서비스 API
+# =============================================================================
+def analyze_thread(
+    user_id: str,
+    target_id: str,
+    messages: List[str],
+    relationship: str = "",
+    tier: str = "free",
+    start_seq: int = 0,
+) -> Dict[str, Any]:
+    """
+    스레드(같은 상대) 증분 분석.
+    - messages 는 스레드의 연속 구간, start_seq 는 messages[0] 의 스레드 내 순번(전체를 보내면 0).
+      빈 메시지도 순번은 차지함(클라이언트 번호와 일치) — 모델에 보낼 때만 제외.
+    - 진행 위치(처리한 메시지 수 + 마지막 메시지 해시)로 새 메시지를 판정 → 이미 분석된 구간은 건너뜀.
+    - 모델에는 '누적 요약 + 새 메시지'만 전달 → 입력 크기 거의 일정.
+    - 모델에 보낸 메시지마다 결과 저장: 최신 메시지는 전체 결과(thread:{user}:{target}:msg:{seq}),
+      나머지는 per_message 한 문장 해석(thread:{user}:{target}:note:{seq}).
+    반환: analyze_emotion 결과 + {"delta": 새 메시지 수, "cached": bool}
+    """
+    msgs = [m.strip() if isinstance(m, str) else "" for m in (messages or [])]
+    start_seq = max(0, int(start_seq or 0))
+    if not any(msgs):
+        out = A.analyze_emotion("", relationship or "")
+        out.update({"delta": 0, "cached": False})
+        return out
+
+    st = _load_state(user_id, target_id)
+    first_seq, delta = _split_delta(st, msgs, start_seq)
+    end_seq = first_seq + len(delta)  # 이번 호출로 처리 완료되는 위치
+    pending = [(first_seq + i, m) for i, m in enumerate(delta) if m]
+
+    # 새 메시지 없음 → 최신(비어 있지 않은) 메시지 결과 재사용
+    if not pending:
+        last_i = max(i for i, m in enumerate(msgs) if m)
+        cached = R.get_json(_result_key(user_id, target_id, start_seq + last_i))
+        if cached and "insight" in cached:
+            if delta:  # 빈 메시지만 새로 왔으면 위치만 전진
+                _advance(st, msgs, start_seq, end_seq)
+                _save_state(user_id, target_id, st)
+            cached.update({"delta": 0, "cached": True})
+            return cached
+        pending = [(start_seq + last_i, msgs[last_i])]
+
+    # 한 번에 보내는 delta도 상한 — 오래된 미분석분은 맥락에서 제외
+    sent = pending[-THREAD_MAX_DELTA:]
+    prompt = _build_thread_prompt(st["summary"], [m for _, m in sent], (relationship or "").strip())
+
+    try:
+        if not A.model_ready():
+            result = A._dummy_result()
+            summary, per = st["summary"], []
+        else:
+            text = A._chat_text(prompt, max_tokens=700, tier=tier)
+            result = A._safe_parse_json(text)
+            summary, per = _extract_extra(text)
+            summary = summary or st["summary"]
+    except Exception as e:
+        # 실패 시 상태를 갱신하지 않아 다음 호출에서 같은 delta를 재시도
+        return {
+            "interpretation": "해석 중 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.",
+            "insight": f"원인: {type(e).__name__}",
+            "tags": ["시스템오류"],
+            "emojis": ["🛠️", "⏳", "🔁"],
+            "delta": len(pending),
+            "cached": False,
+        }
+
+    # 맥락 메시지(sent[:-1])는 per_message 항목과 순서대로 짝지음 (모델이 빠뜨린 것은 저장 안 함)
+    for (seq, _), item in zip(sent[:-1], per):
+        R.set_json(_note_key(user_id, target_id, seq), item)
+    R.set_json(_result_key(user_id, target_id, sent[-1][0]), result)
+
+    st["summary"] = summary[:THREAD_SUMMARY_MAX_CHARS]
+    _advance(st, msgs, start_seq, max(end_seq, sent[-1][0] + 1))
+    _save_state(user_id, target_id, st)
+
+    out = dict(result)
+    out.update({"delta": len(pending), "cached": False})
+    return out
+
+
+def _advance(st: Dict[str, Any], msgs: List[str], start_seq: int, end_seq: int):
+    # 예전 구간을 다시 보낸 경우(end_seq <= count)엔 진행 위치 유지
+    if end_seq > st["count"]:
+        st["count"] = end_seq
+        st["tail"] = _msg_hash(msgs[end_seq - 1 - start_seq])
@@ -35,3 +35,11 @@ CREATE TABLE emotion_results (
     final_comment TEXT,
     is_premium BOOLEAN DEFAULT FALSE
 );
+
+-- 스레드(상대방별) 누적 요약 — 증분 분석 시 '요약 + 새 메시지'만 모델에 전달
+CREATE TABLE thread_summaries (
+    target_user_id INTEGER PRIMARY KEY REFERENCES target_users(id),
+    summary TEXT,
+    last_message_id INTEGER REFERENCES message_logs(id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);